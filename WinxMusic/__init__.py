@@ -3,7 +3,7 @@ from WinxMusic.core.bot import WinxBot
 from WinxMusic.core.dir import dirr
 from WinxMusic.core.git import git
 from WinxMusic.core.userbot import Userbot
-from WinxMusic.misc import dbb, heroku, sudo
+from WinxMusic.misc import dbb, heroku
 
 from .logging import LOGGER
 
@@ -33,9 +33,6 @@ dbb()
 # Heroku APP
 heroku()
 
-# Load Sudo Users from DB
-sudo()
-
 from .platforms import PlaTForms
 
 Platform = PlaTForms()
@@ -7,8 +7,22 @@ from pytgcalls.exceptions import NoActiveGroupCall
 import config
 from WinxMusic import HELPABLE, LOGGER, app, userbot
 from WinxMusic.core.call import Winx
+from WinxMusic.misc import sudo
+from WinxMusic.platforms.Youtube import download_pool, ytdl_pool
 from WinxMusic.utils.cache.cache_manager import CacheManager
-from WinxMusic.utils.database import get_banned_users, get_gbanned
+from WinxMusic.utils.cache.downloads import download_store
+from WinxMusic.utils.database import (
+    flush_json_files,
+    get_banned_users,
+    get_gbanned,
+    migrate_top_stats,
+    preload_assistants,
+    preload_authusers,
+    settings_cache,
+)
+from WinxMusic.utils.database.indexes import ensure_indexes
+from WinxMusic.utils.database.playstats import play_stats
+from WinxMusic.utils.decorators.asyncify import executors
 from config import BANNED_USERS
 
 logger = LOGGER("WinxMusic")
@@ -17,6 +31,18 @@ loop = asyncio.get_event_loop()
 cache_manager = CacheManager(max_size=100, ttl=3600)
 
 
+async def preload_chat_state():
+    results = await asyncio.gather(
+        settings_cache.warm_all(),
+        preload_assistants(),
+        preload_authusers(),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Could not preload chat state: {result}")
+
+
 async def init():
     if len(config.STRING_SESSIONS) == 0:
         logger.error("No Assistant Clients Vars Defined!.. Exiting Process.")
@@ -26,6 +52,15 @@ async def init():
             "No Spotify Vars defined. Your bot won't be able to play spotify queries."
         )
 
+    # Extractors are loaded before the first play
+    try:
+        await asyncio.gather(ytdl_pool.start(), download_pool.start())
+    except Exception as e:
+        logger.warning(f"Could not start the yt-dlp workers: {e}")
+
+    # Load Sudo Users from DB
+    await sudo()
+
     try:
         users = await get_gbanned()
         for user_id in users:
@@ -36,6 +71,19 @@ async def init():
     except Exception:
         pass
 
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not create the database indexes: {e}")
+
+    try:
+        await migrate_top_stats()
+    except Exception as e:
+        logger.warning(f"Could not migrate the top tracks stats: {e}")
+
+    # Loaded while the clients start, so the first command in a chat needs no reads
+    preload = asyncio.create_task(preload_chat_state())
+
     await app.start()
 
     # Load default plugins
@@ -74,6 +122,7 @@ async def init():
 
     await userbot.start()
     await Winx.start()
+    await preload
     LOGGER("WinxMusic").info("Assistant Started Successfully")
 
     try:
@@ -90,6 +139,14 @@ async def init():
     LOGGER("WinxMusic").info("BillaMusic Started Successfully")
 
     await idle()
+    await play_stats.flush()
+    await flush_json_files()
+    if download_store.timer:
+        download_store.flush()
+    ytdl_pool.stop()
+    download_pool.stop()
+    for executor in executors.values():
+        executor.shutdown()
     await app.stop()
     await userbot.stop()
 
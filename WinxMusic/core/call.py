@@ -17,15 +17,18 @@ from pytgcalls.types import (
     GroupCallConfig,
     MediaStream,
     StreamEnded,
+    UpdatedGroupCallParticipant,
 )
 
 import config
 from WinxMusic import LOGGER, Platform, app, userbot
+from WinxMusic.core.participants import CallParticipants
 from WinxMusic.core.userbot import assistants
 from WinxMusic.misc import db
 from WinxMusic.utils.database import (
     add_active_chat,
     add_active_video_chat,
+    assistant_load,
     get_assistant,
     get_audio_bitrate,
     get_lang,
@@ -41,17 +44,37 @@ from WinxMusic.utils.database import (
 from WinxMusic.utils.exceptions import AssistantErr
 from WinxMusic.utils.inline.play import stream_markup, telegram_markup
 from WinxMusic.utils.stream.autoclear import auto_clean
+from WinxMusic.utils.stream.clock import playback_clock
+from WinxMusic.utils.stream.prefetch import prefetcher
 from WinxMusic.utils.thumbnails import gen_thumb
 from strings import get_string
 
 links = {}
 
 
+async def _call_members(chat_id: int) -> dict:
+    userbot = await get_assistant(chat_id)
+    members = {}
+    async for member in userbot.get_call_members(chat_id):
+        if member is None or not member.chat:
+            continue
+        members[member.chat.id] = bool(member.is_muted and not member.can_self_unmute)
+    return members
+
+
+call_participants = CallParticipants(
+    _call_members, max_age=config.PARTICIPANTS_SYNC_INTERVAL
+)
+
+
 async def _clear_(chat_id):
     popped = db.pop(chat_id, None)
     if popped:
         await auto_clean(popped)
     db[chat_id] = []
+    playback_clock.stop(chat_id)
+    call_participants.forget(chat_id)
+    prefetcher.prune()
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
     await set_loop(chat_id, 0)
@@ -71,10 +94,12 @@ class Call:
     async def pause_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.pause(chat_id)
+        playback_clock.pause(chat_id)
 
     async def resume_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.resume(chat_id)
+        playback_clock.resume(chat_id)
 
     async def mute_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
@@ -96,9 +121,12 @@ class Call:
         assistant = await group_assistant(self, chat_id)
         try:
             check = db.get(chat_id)
-            check.pop(0)
+            await auto_clean(check.pop(0))
         except Exception:
             pass
+        prefetcher.prune()
+        playback_clock.stop(chat_id)
+        call_participants.forget(chat_id)
         await remove_active_video_chat(chat_id)
         await remove_active_chat(chat_id)
         try:
@@ -138,8 +166,12 @@ class Call:
             )
 
         await assistant.play(chat_id, stream, config=call_config)
+        playback_clock.start(chat_id)
+        prefetcher.schedule(chat_id)
 
-    async def seek_stream(self, chat_id, file_path, to_seek, duration, mode):
+    async def seek_stream(
+        self, chat_id, file_path, to_seek, duration, mode, position=None
+    ):
         assistant = await group_assistant(self, chat_id)
         audio_stream_quality = await get_audio_bitrate(chat_id)
         video_stream_quality = await get_video_bitrate(chat_id)
@@ -160,6 +192,8 @@ class Call:
             )
         )
         await assistant.play(chat_id, stream, config=call_config)
+        if position is not None:
+            playback_clock.seek(chat_id, position)
 
     async def stream_call(self, link):
         assistant = await group_assistant(self, config.LOG_GROUP_ID)
@@ -224,6 +258,7 @@ class Call:
         except UserAlreadyParticipant:
             pass
         except ChannelsTooMuch:
+            assistant_load.report(chat_id)
             if attempts <= max_attempts:
                 attempts += 1
                 userbot = await set_assistant(chat_id)
@@ -232,6 +267,7 @@ class Call:
                 raise AssistantErr(_["call_9"].format(config.SUPPORT_GROUP))
         except FloodWait as e:
             time = e.value
+            assistant_load.report(chat_id, time)
             if time < 20:
                 await asyncio.sleep(time)
                 attempts += 1
@@ -305,8 +341,13 @@ class Call:
             raise AssistantErr(
                 "**TELEGRAM SERVER ERROR**\n\nPlease restart Your voicechat."
             )
-        await add_active_chat(chat_id)
+        await add_active_chat(
+            chat_id,
+            assistant=self.calls.index(assistant) + 1,
+            stream_type="video" if video else "audio",
+        )
         await music_on(chat_id)
+        playback_clock.start(chat_id)
         if video:
             await add_active_video_chat(chat_id)
 
@@ -348,8 +389,8 @@ class Call:
             video_stream_quality = await get_video_bitrate(chat_id)
             videoid = check[0]["vidid"]
             userid = check[0].get("user_id")
-            check[0]["played"] = 0
             video = True if str(streamtype) == "video" else False
+            prefetcher.update(chat_id)
             call_config = GroupCallConfig(auto_start=False)
             if "live_" in queued:
                 n, link = await Platform.youtube.video(videoid, True)
@@ -389,6 +430,7 @@ class Call:
                         original_chat_id,
                         text=_["call_7"],
                     )
+                playback_clock.start(chat_id)
                 img = await gen_thumb(videoid)
                 button = telegram_markup(_, chat_id)
                 run = await app.send_photo(
@@ -405,17 +447,19 @@ class Call:
                 db[chat_id][0]["mystic"] = run
                 db[chat_id][0]["markup"] = "tg"
             elif "vid_" in queued:
-                mystic = await app.send_message(original_chat_id, _["call_8"])
+                mystic = None
+                if not prefetcher.ready(videoid, video):
+                    mystic = await app.send_message(original_chat_id, _["call_8"])
                 try:
-                    file_path, direct = await Platform.youtube.download(
-                        videoid,
-                        mystic,
-                        videoid=True,
-                        video=True if str(streamtype) == "video" else False,
-                    )
+                    file_path, direct = await prefetcher.fetch(check[0], video)
                 except Exception:
-                    return await mystic.edit_text(
-                        _["call_7"], disable_web_page_preview=True
+                    if mystic:
+                        return await mystic.edit_text(
+                            _["call_7"], disable_web_page_preview=True
+                        )
+                    return await app.send_message(
+                        original_chat_id,
+                        text=_["call_7"],
                     )
                 if video:
                     stream = MediaStream(
@@ -448,9 +492,11 @@ class Call:
                         original_chat_id,
                         text=_["call_7"],
                     )
+                playback_clock.start(chat_id)
                 img = await gen_thumb(videoid)
                 button = stream_markup(_, videoid, chat_id)
-                await mystic.delete()
+                if mystic:
+                    await mystic.delete()
                 run = await app.send_photo(
                     original_chat_id,
                     photo=img,
@@ -485,6 +531,7 @@ class Call:
                         original_chat_id,
                         text=_["call_7"],
                     )
+                playback_clock.start(chat_id)
                 button = telegram_markup(_, chat_id)
                 run = await app.send_photo(
                     original_chat_id,
@@ -537,6 +584,7 @@ class Call:
                         original_chat_id,
                         text=_["call_7"],
                     )
+                playback_clock.start(chat_id)
                 if videoid == "telegram":
                     button = telegram_markup(_, chat_id)
                     run = await app.send_photo(
@@ -624,6 +672,12 @@ class Call:
                     return
                 await self.change_stream(client, update.chat_id)
 
+            @call.on_update(filters.call_participant())
+            async def participants_handler(
+                client, update: UpdatedGroupCallParticipant
+            ):
+                call_participants.on_update(update)
+
     def __getattr__(self, name):
         if not self.calls:
             raise AttributeError(
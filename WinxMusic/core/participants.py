@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+from pytgcalls.types import GroupCallParticipant, UpdatedGroupCallParticipant
+
+
+class CallParticipants:
+    def __init__(self, fetch, max_age: int = 60):
+        """
+        Per-chat view of who is in the voice chat and who is muted by an admin.
+
+        Kept up to date from PyTgCalls participant updates; a chat is fetched again
+        with ``fetch(chat_id)``, which returns ``{user_id: muted_by_admin}``, only
+        when it is first read or its last full fetch is older than ``max_age``
+        seconds.
+        """
+        self.fetch = fetch
+        self.max_age = max_age
+        self.chats = {}  # chat_id -> {"members": {user_id: muted}, "synced": ...}
+        self.inflight = {}
+        self.fetches = 0
+
+    async def _fetch(self, chat_id: int) -> dict:
+        members = await self.fetch(chat_id)
+        self.fetches += 1
+        self.chats[chat_id] = {"members": members, "synced": time.monotonic()}
+        return members
+
+    async def reconcile(self, chat_id: int) -> dict:
+        """Fetches the participants again, sharing one request between callers."""
+        task = self.inflight.get(chat_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(chat_id))
+            self.inflight[chat_id] = task
+            task.add_done_callback(lambda _: self.inflight.pop(chat_id, None))
+        return await asyncio.shield(task)
+
+    async def get(self, chat_id: int) -> dict:
+        """
+        Returns ``{user_id: muted_by_admin}`` for the voice chat of ``chat_id``.
+
+        Raises ``ValueError`` like ``get_call_members`` when there is no voice chat.
+        """
+        state = self.chats.get(chat_id)
+        if state and time.monotonic() - state["synced"] < self.max_age:
+            return state["members"]
+        return await self.reconcile(chat_id)
+
+    def on_update(self, update: UpdatedGroupCallParticipant):
+        state = self.chats.get(update.chat_id)
+        if not state:
+            return
+        participant = update.participant
+        if participant.action == GroupCallParticipant.Action.LEFT:
+            state["members"].pop(participant.user_id, None)
+        else:
+            state["members"][participant.user_id] = bool(participant.muted_by_admin)
+
+    def forget(self, chat_id: int):
+        self.chats.pop(chat_id, None)
@@ -5,7 +5,7 @@ import heroku3
 from pyrogram import filters
 
 import config
-from WinxMusic.core.mongo import pymongodb
+from WinxMusic.core.mongo import mongodb
 from .logging import LOGGER
 
 SUDOERS = filters.user()
@@ -41,21 +41,21 @@ def dbb():
     LOGGER(__name__).info(f"Database Initialized.")
 
 
-def sudo():
+async def sudo():
     global SUDOERS
     OWNER = config.OWNER_ID
     if config.MONGO_DB_URI is None:
         for user_id in OWNER:
             SUDOERS.add(user_id)
     else:
-        sudoersdb = pymongodb.sudoers
-        sudoers = sudoersdb.find_one({"sudo": "sudo"})
+        sudoersdb = mongodb.sudoers
+        sudoers = await sudoersdb.find_one({"sudo": "sudo"})
         sudoers = [] if not sudoers else sudoers["sudoers"]
         for user_id in OWNER:
             SUDOERS.add(user_id)
             if user_id not in sudoers:
                 sudoers.append(user_id)
-                sudoersdb.update_one(
+                await sudoersdb.update_one(
                     {"sudo": "sudo"},
                     {"$set": {"sudoers": sudoers}},
                     upsert=True,
@@ -5,10 +5,26 @@ import aiohttp
 import yt_dlp
 from PIL import Image
 
+from WinxMusic.utils.cache.downloads import download_store
 from WinxMusic.utils.decorators import asyncify
 from config import seconds_to_time
 
 
+@asyncify("cpu")
+def _resize(img_data, thumb_path, size):
+    img = Image.open(BytesIO(img_data))
+    scale_factor = size[1] / img.height
+    new_width = int(img.width * scale_factor)
+    new_height = size[1]
+
+    resized_img = img.resize((new_width, new_height), Image.LANCZOS)
+    new_img = Image.new("RGB", size, (0, 0, 0))
+    new_img.paste(resized_img, ((size[0] - new_width) // 2, 0))
+
+    new_img.save(thumb_path, format="JPEG")
+    return thumb_path
+
+
 class Saavn:
 
     @staticmethod
@@ -28,7 +44,7 @@ class Saavn:
             url = url.split("#")[0]
         return url
 
-    @asyncify
+    @asyncify("download")
     def playlist(self, url, limit):
         clean_url = self.clean_url(url)
         ydl_opts = {
@@ -93,19 +109,22 @@ class Saavn:
     async def download(self, url):
         details = await self.info(url)
         file_path = os.path.join("downloads", f"Saavn_{details['_id']}.mp3")
-
-        if not os.path.exists(file_path):
-            async with aiohttp.ClientSession() as session:
-                async with session.get(details["_download_url"]) as resp:
-                    if resp.status == 200:
-                        with open(file_path, "wb") as f:
-                            while chunk := await resp.content.read(1024):
-                                f.write(chunk)
-                        print(f"Downloaded: {file_path}")
-                    else:
-                        raise ValueError(
-                            f"Failed to download {details['_download_url']}. HTTP Status: {resp.status}"
-                        )
+        key = f"saavn:{details['_id']}"
+
+        if not download_store.get(key):
+            if not os.path.exists(file_path):
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(details["_download_url"]) as resp:
+                        if resp.status == 200:
+                            with open(file_path, "wb") as f:
+                                while chunk := await resp.content.read(1024):
+                                    f.write(chunk)
+                            print(f"Downloaded: {file_path}")
+                        else:
+                            raise ValueError(
+                                f"Failed to download {details['_download_url']}. HTTP Status: {resp.status}"
+                            )
+            download_store.put(key, file_path)
 
         details["filepath"] = file_path
         return file_path, details
@@ -120,14 +139,4 @@ class Saavn:
             async with session.get(thumb_url) as response:
                 img_data = await response.read()
 
-        img = Image.open(BytesIO(img_data))
-        scale_factor = size[1] / img.height
-        new_width = int(img.width * scale_factor)
-        new_height = size[1]
-
-        resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-        new_img = Image.new("RGB", size, (0, 0, 0))
-        new_img.paste(resized_img, ((size[0] - new_width) // 2, 0))
-
-        new_img.save(thumb_path, format="JPEG")
-        return thumb_path
+        return await _resize(img_data, thumb_path, size)
@@ -3,6 +3,7 @@ from typing import Union
 
 from yt_dlp import YoutubeDL
 
+from WinxMusic.utils.cache.downloads import download_store
 from WinxMusic.utils.decorators import asyncify
 from WinxMusic.utils.formatters import seconds_to_min
 
@@ -20,7 +21,7 @@ class SoundCloud:
     async def valid(self, link: str) -> bool:
         return "soundcloud" in link
 
-    @asyncify
+    @asyncify("download")
     def download(self, url: str) -> Union[dict, bool]:
         with YoutubeDL(self.opts):
             try:
@@ -28,6 +29,7 @@ class SoundCloud:
             except Exception:
                 return False
             xyz = path.join("downloads", f"{info['id']}.{info['ext']}")
+            download_store.put(f"soundcloud:{info['id']}", xyz)
             duration_min = seconds_to_min(info["duration"])
             track_details = {
                 "title": info["title"],
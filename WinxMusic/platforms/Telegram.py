@@ -9,6 +9,7 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Voice
 import config
 from WinxMusic import app
 from config import lyrical
+from ..utils.cache.downloads import download_store
 from ..utils.formatters import convert_bytes, get_readable_time, seconds_to_min
 
 downloader = {}
@@ -114,7 +115,10 @@ class Telegram:
     async def download(self, _, message, mystic, fname):
         left_time = {}
         speed_counter = {}
+        key = f"telegram:{os.path.basename(fname)}"
         if os.path.exists(fname):
+            if not download_store.get(key):
+                download_store.put(key, fname)
             return True
 
         async def down_load():
@@ -202,4 +206,5 @@ class Telegram:
         if not verify:
             return False
         lyrical.pop(mystic.id)
+        download_store.put(key, fname)
         return True
@@ -1,15 +1,21 @@
 import asyncio
 import os
-import random
+import pickle
 import re
+import struct
+import sys
+import time
 
 from async_lru import alru_cache
 from py_yt import VideosSearch
 from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
-from yt_dlp import YoutubeDL
 
 import config
+from WinxMusic.logging import LOGGER
+from WinxMusic.utils.cache.downloads import download_store
+from WinxMusic.utils.cache.metadata import VIDEO_ID, metadata_cache, normalize_video_id
+from WinxMusic.utils.cache.streams import stream_urls
 from WinxMusic.utils.database import is_on_off
 from WinxMusic.utils.decorators import asyncify
 from WinxMusic.utils.formatters import seconds_to_min, time_to_seconds
@@ -17,32 +23,331 @@ from WinxMusic.utils.formatters import seconds_to_min, time_to_seconds
 NOTHING = {"cookies_dead": None}
 
 
+# yt-dlp errors meaning YouTube turned the cookie away, not that the video is unavailable
+COOKIE_ERRORS = (
+    "sign in to confirm",
+    "not a bot",
+    "http error 429",
+    "too many requests",
+    "cookies are no longer valid",
+    "login required",
+)
+
+
+class CookiePool:
+    def __init__(self, folder: str, quarantine: int = 60, max_quarantine: int = 3600):
+        """
+        The cookie files of ``folder`` and how well each one works.
+
+        Files are listed once and listed again when the folder changes. Every job
+        picks the cookie with the fewest jobs running, then the best success rate,
+        then the one least recently used, which spreads the load over the accounts.
+        A cookie refused by YouTube is quarantined for ``quarantine`` seconds,
+        doubled on every further refusal up to ``max_quarantine``, and is only picked
+        again once that passed (or when every cookie is quarantined).
+        """
+        self.folder = folder
+        self.quarantine = quarantine
+        self.max_quarantine = max_quarantine
+        self.cookies = {}  # path -> health
+        self.mtime = None
+        self.checked = 0
+
+    @staticmethod
+    def _health() -> dict:
+        return {
+            "successes": 0,
+            "failures": 0,
+            "latency": 0.0,
+            "running": 0,
+            "strikes": 0,
+            "until": 0.0,
+            "used": 0.0,
+        }
+
+    def _scan(self):
+        now = time.monotonic()
+        if now - self.checked < 10 and self.cookies:
+            return
+        self.checked = now
+        try:
+            mtime = os.stat(self.folder).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self.mtime and self.cookies:
+            return
+        self.mtime = mtime
+        try:
+            files = [
+                os.path.join(self.folder, file)
+                for file in os.listdir(self.folder)
+                if file.endswith(".txt")
+            ]
+        except OSError:
+            files = []
+        self.cookies = {
+            path: self.cookies.get(path) or self._health() for path in files
+        }
+
+    def pick(self) -> str:
+        self._scan()
+        if not self.cookies:
+            raise FileNotFoundError(
+                "No Cookies found in cookies directory make sure your cookies file written  .txt file"
+            )
+        now = time.monotonic()
+        healthy = [p for p, h in self.cookies.items() if h["until"] <= now]
+        if not healthy:
+            return min(self.cookies, key=lambda p: self.cookies[p]["until"])
+
+        def rank(path):
+            health = self.cookies[path]
+            done = health["successes"] + health["failures"]
+            rate = health["successes"] / done if done else 1.0
+            return health["running"], -rate, health["used"]
+
+        path = min(healthy, key=rank)
+        self.cookies[path]["used"] = now
+        return path
+
+    def started(self, path: str):
+        if path in self.cookies:
+            self.cookies[path]["running"] += 1
+
+    def report(self, path: str, latency: float, error: str = None):
+        health = self.cookies.get(path)
+        if health is None:
+            return
+        health["running"] = max(0, health["running"] - 1)
+        if error is None:
+            health["successes"] += 1
+            health["strikes"] = 0
+            health["until"] = 0.0
+            # Moving average, recent jobs weigh the most
+            health["latency"] = health["latency"] * 0.8 + latency * 0.2
+            return
+        if not any(reason in error.lower() for reason in COOKIE_ERRORS):
+            return
+        health["failures"] += 1
+        delay = min(self.max_quarantine, self.quarantine * 2 ** health["strikes"])
+        health["strikes"] += 1
+        health["until"] = time.monotonic() + delay
+        LOGGER(__name__).warning(
+            f"Cookie {os.path.basename(path)} quarantined for {delay}s: {error[:100]}"
+        )
+
+    def get_stats(self):
+        now = time.monotonic()
+        return {
+            os.path.basename(path): {
+                "successes": health["successes"],
+                "failures": health["failures"],
+                "latency": health["latency"],
+                "quarantined": max(0, int(health["until"] - now)),
+            }
+            for path, health in self.cookies.items()
+        }
+
+
+cookie_pool = CookiePool(
+    f"{os.getcwd()}/cookies",
+    quarantine=config.COOKIE_QUARANTINE,
+    max_quarantine=config.COOKIE_MAX_QUARANTINE,
+)
+
+
 def cookies():
-    folder_path = f"{os.getcwd()}/cookies"
-    txt_files = [file for file in os.listdir(folder_path) if file.endswith(".txt")]
-    if not txt_files:
-        raise FileNotFoundError(
-            "No Cookies found in cookies directory make sure your cookies file written  .txt file"
+    return cookie_pool.pick()
+
+
+WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ytdl_worker.py")
+HEADER = struct.Struct("!I")
+
+
+class _Worker:
+    """One ``ytdl_worker.py`` process, running one job at a time."""
+
+    def __init__(self, process):
+        self.process = process
+
+    @classmethod
+    async def spawn(cls):
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            WORKER,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
         )
-    cookie_txt_file = random.choice(txt_files)
-    cookie_txt_file = os.path.join(folder_path, cookie_txt_file)
-    return cookie_txt_file
-    # return f"""cookies/{str(cookie_txt_file).split("/")[-1]}"""
-
-
-async def shell_cmd(cmd):
-    proc = await asyncio.create_subprocess_shell(
-        cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    out, errorz = await proc.communicate()
-    if errorz:
-        if "unavailable videos are hidden" in (errorz.decode("utf-8")).lower():
-            return out.decode("utf-8")
+        worker = cls(process)
+        try:
+            # The worker answers once its extractors are loaded
+            await worker._read()
+        except BaseException:
+            worker.kill()
+            raise
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def _read(self):
+        header = await self.process.stdout.readexactly(HEADER.size)
+        data = await self.process.stdout.readexactly(HEADER.unpack(header)[0])
+        return pickle.loads(data)
+
+    async def call(self, *job):
+        data = pickle.dumps(job, protocol=pickle.HIGHEST_PROTOCOL)
+        self.process.stdin.write(HEADER.pack(len(data)) + data)
+        await self.process.stdin.drain()
+        ok, result = await self._read()
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    def kill(self):
+        if self.alive:
+            self.process.kill()
+
+
+class ExtractorPool:
+    def __init__(self, workers: int, timeout: int):
+        """
+        Up to ``workers`` long-lived processes running yt-dlp.
+
+        Workers are started as fresh interpreters, never forked from the bot, and
+        keep their YoutubeDL instances between jobs. A job waits for a free worker
+        first; its ``timeout`` only starts once a worker picked it up. A job that
+        times out or is cancelled kills its own worker, which is replaced on demand,
+        and leaves the other jobs alone.
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(workers)
+        self.idle = []
+        self.spawned = 0
+        self.jobs = 0
+        self.busy = 0
+        self.waiting = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    async def _acquire(self) -> _Worker:
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            while self.idle:
+                worker = self.idle.pop()
+                if worker.alive:
+                    return worker
+            self.spawned += 1
+            return await _Worker.spawn()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def _release(self, worker: _Worker, healthy: bool):
+        if healthy and worker.alive:
+            self.idle.append(worker)
         else:
-            return errorz.decode("utf-8")
-    return out.decode("utf-8")
+            self.restarts += 1
+            worker.kill()
+        self.slots.release()
+
+    async def run(self, *job, timeout: int = None):
+        worker = await self._acquire()
+        self.jobs += 1
+        self.busy += 1
+        healthy = False
+        try:
+            result = await asyncio.wait_for(worker.call(*job), timeout or self.timeout)
+            healthy = True
+            return result
+        except RuntimeError:
+            # yt-dlp raised, the worker itself is fine
+            healthy = True
+            raise
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            LOGGER(__name__).warning("yt-dlp job timed out, replacing its worker")
+            raise
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            raise RuntimeError(f"yt-dlp worker exited: {e}") from None
+        finally:
+            self.busy -= 1
+            self._release(worker, healthy)
+
+    async def start(self):
+        """Starts the workers and loads their extractors before the first job."""
+        workers = await asyncio.gather(*[self._acquire() for _ in range(self.workers)])
+        for worker in workers:
+            self._release(worker, True)
+
+    def stop(self):
+        while self.idle:
+            self.idle.pop().kill()
+
+    async def _job(self, url: str, options: dict, download: bool, timeout: int):
+        cookie = cookie_pool.pick()
+        options = {"quiet": True, "no_warnings": True, "cookiefile": cookie, **options}
+        cookie_pool.started(cookie)
+        started = time.monotonic()
+        try:
+            result = await self.run(options, url, download, timeout=timeout)
+        except Exception as e:
+            cookie_pool.report(cookie, time.monotonic() - started, str(e) or repr(e))
+            raise
+        cookie_pool.report(cookie, time.monotonic() - started)
+        return result
+
+    async def extract_info(self, url: str, options: dict = None, timeout: int = None):
+        return await self._job(url, options or {}, False, timeout)
+
+    async def get_url(self, url: str, format: str = "best", timeout: int = None) -> str:
+        """The direct stream URL of ``url`` in ``format``, like ``yt-dlp -g``."""
+        info = await self.extract_info(
+            url, {"format": format, "noplaylist": True}, timeout=timeout
+        )
+        if info.get("url"):
+            return info["url"]
+        return info["requested_formats"][0]["url"]
+
+    async def flat_playlist(self, url: str, limit: int, timeout: int = None) -> list:
+        """Ids of the first ``limit`` available videos of a playlist."""
+        info = await self.extract_info(
+            url,
+            {
+                "extract_flat": "in_playlist",
+                "playlistend": limit,
+                "ignoreerrors": True,
+                "compat_opts": ["no-youtube-unavailable-videos"],
+            },
+            timeout=timeout,
+        )
+        return [entry["id"] for entry in info.get("entries") or [] if entry]
+
+    async def download(self, url: str, options: dict, timeout: int = None):
+        """Downloads ``url`` and returns its info and file name."""
+        return await self._job(url, options, True, timeout)
+
+    def get_stats(self):
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "waiting": self.waiting,
+            "jobs": self.jobs,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+        }
+
+
+ytdl_pool = ExtractorPool(config.YTDLP_WORKERS, config.YTDLP_TIMEOUT)
+download_pool = ExtractorPool(config.YTDLP_DOWNLOAD_WORKERS, config.YTDLP_DOWNLOAD_TIMEOUT)
+store_download = asyncify(download_store.put)
 
 
 class YouTube:
@@ -70,8 +375,7 @@ class YouTube:
         if NOTHING["cookies_dead"] is None:
             NOTHING["cookies_dead"] = value
 
-    @asyncify
-    def url(self, message_1: Message) -> str | None:
+    async def url(self, message_1: Message) -> str | None:
         messages = [message_1]
         if message_1.reply_to_message:
             messages.append(message_1.reply_to_message)
@@ -95,104 +399,84 @@ class YouTube:
             return None
         return text[offset : offset + length]
 
-    @alru_cache(maxsize=None)
-    async def details(self, link: str, videoid: bool | str = None):
+    @metadata_cache.cached("lookup")
+    async def lookup(self, link: str, videoid: bool | str = None) -> dict:
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
         results = VideosSearch(link, limit=1)
         for result in (await results.next())["result"]:
-            title = result["title"]
             duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-            vidid = result["id"]
             if str(duration_min) == "None":
                 duration_sec = 0
             else:
                 duration_sec = int(time_to_seconds(duration_min))
-        return title, duration_min, duration_sec, thumbnail, vidid
+            return {
+                "title": result["title"],
+                "duration_min": duration_min,
+                "duration_sec": duration_sec,
+                "thumb": result["thumbnails"][0]["url"].split("?")[0],
+                "vidid": result["id"],
+                "link": result["link"],
+            }
+        raise ValueError(f"No results found for {link}")
+
+    async def details(self, link: str, videoid: bool | str = None):
+        track = await self.lookup(link, videoid)
+        return (
+            track["title"],
+            track["duration_min"],
+            track["duration_sec"],
+            track["thumb"],
+            track["vidid"],
+        )
 
-    @alru_cache(maxsize=None)
     async def title(self, link: str, videoid: bool | str = None):
-        if videoid:
-            link = self.base + link
-        if "&" in link:
-            link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-        return title
+        return (await self.lookup(link, videoid))["title"]
 
-    @alru_cache(maxsize=None)
     async def duration(self, link: str, videoid: bool | str = None):
-        if videoid:
-            link = self.base + link
-        if "&" in link:
-            link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            duration = result["duration"]
-        return duration
+        return (await self.lookup(link, videoid))["duration_min"]
 
-    @alru_cache(maxsize=None)
     async def thumbnail(self, link: str, videoid: bool | str = None):
-        if videoid:
-            link = self.base + link
-        if "&" in link:
-            link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        return thumbnail
+        return (await self.lookup(link, videoid))["thumb"]
 
     async def video(self, link: str, videoid: bool | str = None):
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        cmd = [
-            "yt-dlp",
-            f"--cookies",
-            cookies(),
-            "-g",
-            "-f",
-            "best[height<=?720][width<=?1280]",
-            f"{link}",
-        ]
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        try:
+            # Also used for live streams, whose url must last an hour of playback
+            return 1, await self.stream_url(
+                link, "best[height<=?720][width<=?1280]", min_left=3600
+            )
+        except Exception as e:
+            return 0, str(e)
+
+    async def stream_url(self, link: str, format: str, min_left: int = 0) -> str:
+        """Direct url of ``link`` in ``format``, shared by all chats until it expires."""
+        vidid = normalize_video_id(link)
+        if not VIDEO_ID.match(vidid):
+            return await ytdl_pool.get_url(link, format)
+        return await stream_urls.get(
+            vidid, format, lambda: ytdl_pool.get_url(link, format), min_left
         )
-        stdout, stderr = await proc.communicate()
-        if stdout:
-            return 1, stdout.decode().split("\n")[0]
-        else:
-            return 0, stderr.decode()
 
-    @alru_cache(maxsize=None)
+    @metadata_cache.cached("playlist", "limit")
     async def playlist(self, link, limit, videoid: bool | str = None):
         if videoid:
             link = self.listbase + link
         if "&" in link:
             link = link.split("&")[0]
 
-        cmd = (
-            f"yt-dlp -i --compat-options no-youtube-unavailable-videos "
-            f'--get-id --flat-playlist --playlist-end {limit} --skip-download "{link}" '
-            f"2>/dev/null"
-        )
-
-        playlist = await shell_cmd(cmd)
-
         try:
-            result = [key for key in playlist.split("\n") if key]
+            result = await ytdl_pool.flat_playlist(link, limit)
         except Exception:
             result = []
         return result
 
-    @alru_cache(maxsize=None)
+    @metadata_cache.cached("track")
     async def track(self, link: str, videoid: bool | str = None):
         if videoid:
             link = self.base + link
@@ -201,93 +485,73 @@ class YouTube:
         if link.startswith("http://") or link.startswith("https://"):
             return await self._track(link)
         try:
-            results = VideosSearch(link, limit=1)
-            for result in (await results.next())["result"]:
-                title = result["title"]
-                duration_min = result["duration"]
-                vidid = result["id"]
-                yturl = result["link"]
-                thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+            result = await self.lookup(link)
             track_details = {
-                "title": title,
-                "link": yturl,
-                "vidid": vidid,
-                "duration_min": duration_min,
-                "thumb": thumbnail,
+                "title": result["title"],
+                "link": result["link"],
+                "vidid": result["vidid"],
+                "duration_min": result["duration_min"],
+                "thumb": result["thumb"],
             }
-            return track_details, vidid
+            return track_details, result["vidid"]
         except Exception:
             return await self._track(link)
 
-    @asyncify
-    def _track(self, q):
-        options = {
-            "format": "best",
-            "noplaylist": True,
-            "quiet": True,
-            "extract_flat": "in_playlist",
-            "cookiefile": f"{cookies()}",
+    async def _track(self, q):
+        info_dict = await ytdl_pool.extract_info(
+            f"ytsearch: {q}",
+            {"format": "best", "noplaylist": True, "extract_flat": "in_playlist"},
+        )
+        details = info_dict.get("entries")[0]
+        info = {
+            "title": details["title"],
+            "link": details["url"],
+            "vidid": details["id"],
+            "duration_min": (
+                seconds_to_min(details["duration"])
+                if details["duration"] != 0
+                else None
+            ),
+            "thumb": details["thumbnails"][0]["url"],
         }
-        with YoutubeDL(options) as ydl:
-            info_dict = ydl.extract_info(f"ytsearch: {q}", download=False)
-            details = info_dict.get("entries")[0]
-            info = {
-                "title": details["title"],
-                "link": details["url"],
-                "vidid": details["id"],
-                "duration_min": (
-                    seconds_to_min(details["duration"])
-                    if details["duration"] != 0
-                    else None
-                ),
-                "thumb": details["thumbnails"][0]["url"],
-            }
-            return info, details["id"]
+        return info, details["id"]
 
     @alru_cache(maxsize=None)
-    @asyncify
-    def formats(self, link: str, videoid: bool | str = None):
+    async def formats(self, link: str, videoid: bool | str = None):
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
 
-        ytdl_opts = {
-            "quiet": True,
-            "cookiefile": f"{cookies()}",
-        }
-
-        ydl = YoutubeDL(ytdl_opts)
-        with ydl:
-            formats_available = []
-            r = ydl.extract_info(link, download=False)
-            for format in r["formats"]:
+        formats_available = []
+        r = await ytdl_pool.extract_info(link)
+        for format in r["formats"]:
+            try:
+                str(format["format"])
+            except Exception:
+                continue
+            if "dash" not in str(format["format"]).lower():
                 try:
-                    str(format["format"])
-                except Exception:
+                    format["format"]
+                    format["filesize"]
+                    format["format_id"]
+                    format["ext"]
+                    format["format_note"]
+                except KeyError:
                     continue
-                if "dash" not in str(format["format"]).lower():
-                    try:
-                        format["format"]
-                        format["filesize"]
-                        format["format_id"]
-                        format["ext"]
-                        format["format_note"]
-                    except KeyError:
-                        continue
-                    formats_available.append(
-                        {
-                            "format": format["format"],
-                            "filesize": format["filesize"],
-                            "format_id": format["format_id"],
-                            "ext": format["ext"],
-                            "format_note": format["format_note"],
-                            "yturl": link,
-                        }
-                    )
+                formats_available.append(
+                    {
+                        "format": format["format"],
+                        "filesize": format["filesize"],
+                        "format_id": format["format_id"],
+                        "ext": format["ext"],
+                        "format_note": format["format_note"],
+                        "yturl": link,
+                    }
+                )
         return formats_available, link
 
-    @alru_cache(maxsize=None)
+    @metadata_cache.cached("slider", "query_type")
     async def slider(
         self,
         link: str,
@@ -319,53 +583,42 @@ class YouTube:
     ) -> str:
         if videoid:
             link = self.base + link
+        vidid = normalize_video_id(link)
+        if not VIDEO_ID.match(vidid):
+            vidid = None
 
-        @asyncify
-        def audio_dl():
+        async def audio_dl():
+            if vidid and (path := download_store.get(f"youtube:{vidid}:audio")):
+                return path
             ydl_optssx = {
                 "format": "bestaudio/best",
                 "outtmpl": "downloads/%(id)s.%(ext)s",
                 "geo_bypass": True,
                 "noplaylist": True,
                 "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-                "cookiefile": f"{cookies()}",
                 "prefer_ffmpeg": True,
             }
-
-            with YoutubeDL(ydl_optssx) as x:
-                info = x.extract_info(link, False)
-                xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
-                if os.path.exists(xyz):
-                    return xyz
-                x.download([link])
-                return xyz
-
-        @asyncify
-        def video_dl():
+            # Already downloaded files are skipped by yt-dlp itself
+            info, _ = await download_pool.download(link, ydl_optssx)
+            xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
+            return await store_download(f"youtube:{info['id']}:audio", xyz)
+
+        async def video_dl():
+            if vidid and (path := download_store.get(f"youtube:{vidid}:video")):
+                return path
             ydl_optssx = {
                 "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
                 "outtmpl": "downloads/%(id)s.%(ext)s",
                 "geo_bypass": True,
                 "noplaylist": True,
                 "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
                 "prefer_ffmpeg": True,
-                "cookiefile": f"{cookies()}",
             }
+            info, _ = await download_pool.download(link, ydl_optssx)
+            xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
+            return await store_download(f"youtube:{info['id']}:video", xyz)
 
-            with YoutubeDL(ydl_optssx) as x:
-                info = x.extract_info(link, False)
-                xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
-                if os.path.exists(xyz):
-                    return xyz
-                x.download([link])
-                return xyz
-
-        @asyncify
-        def song_video_dl():
+        async def song_video_dl():
             formats = f"{format_id}+140"
             fpath = f"downloads/{title}"
             ydl_optssx = {
@@ -374,20 +627,13 @@ class YouTube:
                 "geo_bypass": True,
                 "noplaylist": True,
                 "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
                 "prefer_ffmpeg": True,
                 "merge_output_format": "mp4",
-                "cookiefile": f"{cookies()}",
             }
+            _, file_path = await download_pool.download(link, ydl_optssx)
+            return file_path
 
-            with YoutubeDL(ydl_optssx) as x:
-                info = x.extract_info(link)
-                file_path = x.prepare_filename(info)
-                return file_path
-
-        @asyncify
-        def song_audio_dl():
+        async def song_audio_dl():
             fpath = f"downloads/{title}.%(ext)s"
             ydl_optssx = {
                 "format": format_id,
@@ -395,8 +641,6 @@ class YouTube:
                 "geo_bypass": True,
                 "noplaylist": True,
                 "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
                 "prefer_ffmpeg": True,
                 "postprocessors": [
                     {
@@ -405,13 +649,9 @@ class YouTube:
                         "preferredquality": "192",
                     }
                 ],
-                "cookiefile": f"{cookies()}",
             }
-
-            with YoutubeDL(ydl_optssx) as x:
-                info = x.extract_info(link)
-                file_path = x.prepare_filename(info)
-                return file_path
+            _, file_path = await download_pool.download(link, ydl_optssx)
+            return file_path
 
         if songvideo:
             return await song_video_dl()
@@ -420,31 +660,17 @@ class YouTube:
             return await song_audio_dl()
 
         elif video:
-            if await is_on_off(config.YTDOWNLOADER):
+            if vidid and download_store.has(f"youtube:{vidid}:video"):
+                direct = True
+                downloaded_file = await video_dl()
+            elif await is_on_off(config.YTDOWNLOADER):
                 direct = True
                 downloaded_file = await video_dl()
             else:
-                command = [
-                    "yt-dlp",
-                    f"--cookies",
-                    cookies(),
-                    "-g",
-                    "-f",
-                    "best",
-                    link,
-                ]
-
-                proc = await asyncio.create_subprocess_exec(
-                    *command,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                stdout, stderr = await proc.communicate()
-
-                if stdout:
-                    downloaded_file = stdout.decode().split("\n")[0]
+                try:
+                    downloaded_file = await self.stream_url(link, "best")
                     direct = None
-                else:
+                except Exception:
                     downloaded_file = await video_dl()
                     direct = True
         else:
@@ -0,0 +1,99 @@
+"""
+yt-dlp worker process, started by ``ExtractorPool`` in Youtube.py.
+
+Runs as a script in a fresh interpreter (it must not import WinxMusic) and keeps
+its YoutubeDL instances between jobs, so extractors are loaded once per worker
+instead of once per call. Jobs and results are length-prefixed pickles on
+stdin/stdout.
+"""
+
+import collections
+import json
+import os
+import pickle
+import struct
+import sys
+
+# Run as a script, this folder is first on sys.path; its modules are not ours to import
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path = [path for path in sys.path if os.path.abspath(path) != _here]
+
+from yt_dlp import YoutubeDL  # noqa: E402
+
+HEADER = struct.Struct("!I")
+
+_extractors = collections.OrderedDict()
+
+
+def _close(ydl: YoutubeDL):
+    # close() writes the cookie jar loaded at start back to the cookie file, which
+    # may have been replaced since; the file is only ever read here.
+    ydl.params["cookiefile"] = None
+    ydl.close()
+
+
+def _mtime(path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns if path else 0
+    except OSError:
+        return 0
+
+
+def _extractor(options: dict) -> YoutubeDL:
+    """
+    The YoutubeDL instance for ``options``, made again when its cookie file
+    changed so a replaced cookie is picked up.
+    """
+    key = json.dumps(options, sort_keys=True)
+    mtime = _mtime(options.get("cookiefile"))
+    cached = _extractors.get(key)
+    if cached and cached[1] != mtime:
+        _close(_extractors.pop(key)[0])
+        cached = None
+    if cached is None:
+        cached = _extractors[key] = (YoutubeDL(options), mtime)
+        while len(_extractors) > 16:
+            _close(_extractors.popitem(last=False)[1][0])
+    _extractors.move_to_end(key)
+    return cached[0]
+
+
+def _extract(options: dict, url: str, download: bool):
+    ydl = _extractor(options)
+    info = ydl.sanitize_info(ydl.extract_info(url, download=download))
+    if download:
+        return info, ydl.prepare_filename(info)
+    return info
+
+
+def _read(stream):
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    return pickle.loads(stream.read(HEADER.unpack(header)[0]))
+
+
+def _write(stream, message):
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def main():
+    # Keep stdout for results, anything yt-dlp prints goes to stderr
+    out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    jobs = sys.stdin.buffer
+
+    _extractor({"quiet": True}).get_info_extractor("Youtube")
+    _write(out, (True, None))
+    while (job := _read(jobs)) is not None:
+        try:
+            _write(out, (True, _extract(*job)))
+        except Exception as e:
+            # yt-dlp errors don't always survive pickling back to the bot
+            _write(out, (False, str(e) or repr(e)))
+
+
+if __name__ == "__main__":
+    main()
@@ -33,6 +33,8 @@ from WinxMusic.utils.inline.play import (
     telegram_markup,
 )
 from WinxMusic.utils.stream.autoclear import auto_clean
+from WinxMusic.utils.stream.clock import playback_clock
+from WinxMusic.utils.stream.prefetch import prefetcher
 from WinxMusic.utils.stream.stream import stream
 from WinxMusic.utils.thumbnails import gen_thumb
 from config import (
@@ -211,6 +213,7 @@ async def admin_callback(_client: Client, callback_query: CallbackQuery, _):
         await callback_query.answer()
         random.shuffle(check)
         check.insert(0, popped)
+        prefetcher.update(chat_id)
         await callback_query.message.reply_text(
             _["admin_23"].format(mention), disable_web_page_preview=True
         )
@@ -238,10 +241,9 @@ async def admin_callback(_client: Client, callback_query: CallbackQuery, _):
                     _["admin_10"].format(mention), disable_web_page_preview=True
                 )
                 return await Winx.stop_stream(chat_id)
-        elif command == "Replay":
-            db[chat_id][0]["played"] = 0
 
         await callback_query.answer()
+        prefetcher.update(chat_id)
         queued = check[0]["file"]
         title = (check[0]["title"]).title()
         user = check[0]["by"]
@@ -249,7 +251,6 @@ async def admin_callback(_client: Client, callback_query: CallbackQuery, _):
         videoid = check[0]["vidid"]
         duration_min = check[0]["dur"]
         status = True if str(streamtype) == "video" else None
-        db[chat_id][0]["played"] = 0
         if "live_" in queued:
             n, link = await Platform.youtube.video(videoid, True)
             if n == 0:
@@ -279,12 +280,7 @@ async def admin_callback(_client: Client, callback_query: CallbackQuery, _):
                 _["call_8"], disable_web_page_preview=True
             )
             try:
-                file_path, direct = await Platform.youtube.download(
-                    videoid,
-                    mystic,
-                    videoid=True,
-                    video=status,
-                )
+                file_path, direct = await prefetcher.fetch(check[0], status)
             except Exception:
                 return await mystic.edit_text(_["call_7"])
             try:
@@ -393,7 +389,7 @@ async def admin_callback(_client: Client, callback_query: CallbackQuery, _):
         file_path = playing[0]["file"]
         if "index_" in file_path or "live_" in file_path:
             return await callback_query.answer(_["admin_30"], show_alert=True)
-        duration_played = int(playing[0]["played"])
+        duration_played = playback_clock.played(chat_id, duration_seconds)
         if int(command) in [1, 2]:
             duration_to_skip = 10
         else:
@@ -428,13 +424,10 @@ async def admin_callback(_client: Client, callback_query: CallbackQuery, _):
                 seconds_to_min(to_seek),
                 duration,
                 playing[0]["streamtype"],
+                position=to_seek,
             )
         except Exception:
             return await mystic.edit_text(_["admin_34"])
-        if int(command) in [1, 3]:
-            db[chat_id][0]["played"] -= duration_to_skip
-        else:
-            db[chat_id][0]["played"] += duration_to_skip
         string = _["admin_33"].format(seconds_to_min(to_seek))
         await mystic.edit_text(f"{string}\n\nChanges Done by: {mention} !")
 
@@ -5,6 +5,7 @@ from WinxMusic import Platform, app
 from WinxMusic.core.call import Winx
 from WinxMusic.misc import db
 from WinxMusic.utils import admin_rights_check, seconds_to_min
+from WinxMusic.utils.stream.clock import playback_clock
 from config import BANNED_USERS
 from strings import command
 
@@ -28,7 +29,7 @@ async def seek_comm(cli, message: Message, _, chat_id):
     file_path = playing[0]["file"]
     if "index_" in file_path or "live_" in file_path:
         return await message.reply_text(_["admin_30"])
-    duration_played = int(playing[0]["played"])
+    duration_played = playback_clock.played(chat_id, duration_seconds)
     duration_to_skip = int(query)
     duration = playing[0]["dur"]
     if message.command[0][-2] == "c":
@@ -55,11 +56,8 @@ async def seek_comm(cli, message: Message, _, chat_id):
             seconds_to_min(to_seek),
             duration,
             playing[0]["streamtype"],
+            position=to_seek,
         )
     except Exception:
         return await mystic.edit_text(_["admin_34"])
-    if message.command[0][-2] == "c":
-        db[chat_id][0]["played"] -= duration_to_skip
-    else:
-        db[chat_id][0]["played"] += duration_to_skip
     await mystic.edit_text(_["admin_33"].format(seconds_to_min(to_seek)))
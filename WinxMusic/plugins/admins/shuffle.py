@@ -6,6 +6,7 @@ from pyrogram.types import Message
 from WinxMusic import app
 from WinxMusic.misc import db
 from WinxMusic.utils.decorators import admin_rights_check
+from WinxMusic.utils.stream.prefetch import prefetcher
 from config import BANNED_USERS
 from strings import command
 
@@ -28,4 +29,5 @@ async def admins(Client, message: Message, _, chat_id):
         return await message.reply_text(_["admin_22"])
     random.shuffle(check)
     check.insert(0, popped)
+    prefetcher.update(chat_id)
     await message.reply_text(_["admin_23"].format(message.from_user.mention))
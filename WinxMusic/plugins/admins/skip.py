@@ -9,6 +9,7 @@ from WinxMusic.utils.database import get_loop
 from WinxMusic.utils.decorators import admin_rights_check
 from WinxMusic.utils.inline.play import stream_markup, telegram_markup
 from WinxMusic.utils.stream.autoclear import auto_clean
+from WinxMusic.utils.stream.prefetch import prefetcher
 from WinxMusic.utils.thumbnails import gen_thumb
 from config import BANNED_USERS
 from strings import command
@@ -93,6 +94,7 @@ async def skip(cli, message: Message, _, chat_id):
                 return await Winx.stop_stream(chat_id)
             except Exception:
                 return
+    prefetcher.update(chat_id)
     queued = check[0]["file"]
     title = (check[0]["title"]).title()
     user = check[0]["by"]
@@ -134,12 +136,7 @@ async def skip(cli, message: Message, _, chat_id):
     elif "vid_" in queued:
         mystic = await message.reply_text(_["call_8"], disable_web_page_preview=True)
         try:
-            file_path, direct = await Platform.youtube.download(
-                videoid,
-                mystic,
-                videoid=True,
-                video=status,
-            )
+            file_path, direct = await prefetcher.fetch(check[0], status)
         except Exception:
             return await mystic.edit_text(_["call_7"])
         try:
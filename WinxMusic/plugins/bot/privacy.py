@@ -17,6 +17,7 @@ from WinxMusic.utils.database import (
     get_userss,
     is_banned_user,
     remove_sudo,
+    set_authusers,
 )
 from config import BANNED_USERS
 from strings import command
@@ -104,9 +105,7 @@ async def delete_auth_user_data(auth_user_id):
         for key in keys_to_remove:
             notes.pop(key)
         if keys_to_remove:
-            await authuserdb.update_one(
-                {"chat_id": chat_id}, {"$set": {"notes": notes}}
-            )
+            await set_authusers(chat_id, notes)
 
 
 @app.on_message(command("PRIVACY_COMMAND") & ~BANNED_USERS)
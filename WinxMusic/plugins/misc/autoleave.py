@@ -6,9 +6,8 @@ from pyrogram.enums import ChatType
 
 import config
 from WinxMusic import app
-from WinxMusic.core.call import Winx
+from WinxMusic.core.call import Winx, call_participants
 from WinxMusic.utils.database import (
-    get_assistant,
     get_client,
     get_lang,
     is_active_chat,
@@ -66,14 +65,8 @@ async def auto_end():
                     del autoend[chat_id]
                     continue
 
-                userbot = await get_assistant(chat_id)
-                members = []
-
                 try:
-                    async for member in userbot.get_call_members(chat_id):
-                        if member is None:
-                            continue
-                        members.append(member)
+                    members = await call_participants.get(chat_id)
                 except ValueError:
                     try:
                         await Winx.stop_stream(chat_id)
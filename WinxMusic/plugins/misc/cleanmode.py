@@ -12,18 +12,15 @@ from WinxMusic.utils.database import (
     get_active_chats,
     get_authuser_names,
     get_client,
-    get_particular_top,
-    get_served_chats,
-    get_served_users,
-    get_user_top,
     is_cleanmode_on,
+    iter_served_chats,
+    iter_served_users,
     set_queries,
-    update_particular_top,
-    update_user_top,
 )
+from WinxMusic.utils.database.playstats import play_stats
 from WinxMusic.utils.decorators.language import language
 from WinxMusic.utils.formatters import alpha_to_int
-from config import adminlist, chatstats, clean, userstats
+from config import adminlist, clean
 from strings import command
 
 AUTO_DELETE = config.CLEANMODE_DELETE_MINS
@@ -92,11 +89,7 @@ async def braodcast_message(client, message, _):
     if "-nobot" not in message.text:
         sent = 0
         pin = 0
-        chats = []
-        schats = await get_served_chats()
-        for chat in schats:
-            chats.append(int(chat["chat_id"]))
-        for i in chats:
+        async for i in iter_served_chats():
             if i == config.LOG_GROUP_ID:
                 continue
             try:
@@ -134,11 +127,7 @@ async def braodcast_message(client, message, _):
     if "-user" in message.text:
         susr = 0
         pin = 0
-        served_users = []
-        susers = await get_served_users()
-        for user in susers:
-            served_users.append(int(user["user_id"]))
-        for i in served_users:
+        async for i in iter_served_users():
             try:
                 m = (
                     await app.forward_messages(i, y, x)
@@ -210,39 +199,6 @@ async def braodcast_message(client, message, _):
 
 async def auto_clean():
     while not await asyncio.sleep(AUTO_SLEEP):
-        try:
-            for chat_id in chatstats:
-                for dic in chatstats[chat_id]:
-                    vidid = dic["vidid"]
-                    title = dic["title"]
-                    chatstats[chat_id].pop(0)
-                    spot = await get_particular_top(chat_id, vidid)
-                    if spot:
-                        spot = spot["spot"]
-                        next_spot = spot + 1
-                        new_spot = {"spot": next_spot, "title": title}
-                        await update_particular_top(chat_id, vidid, new_spot)
-                    else:
-                        next_spot = 1
-                        new_spot = {"spot": next_spot, "title": title}
-                        await update_particular_top(chat_id, vidid, new_spot)
-            for user_id in userstats:
-                for dic in userstats[user_id]:
-                    vidid = dic["vidid"]
-                    title = dic["title"]
-                    userstats[user_id].pop(0)
-                    spot = await get_user_top(user_id, vidid)
-                    if spot:
-                        spot = spot["spot"]
-                        next_spot = spot + 1
-                        new_spot = {"spot": next_spot, "title": title}
-                        await update_user_top(user_id, vidid, new_spot)
-                    else:
-                        next_spot = 1
-                        new_spot = {"spot": next_spot, "title": title}
-                        await update_user_top(user_id, vidid, new_spot)
-        except Exception:
-            continue
         try:
             for chat_id in clean:
                 if chat_id == config.LOG_GROUP_ID:
@@ -279,3 +235,4 @@ async def auto_clean():
 
 
 asyncio.create_task(auto_clean())
+asyncio.create_task(play_stats.run())
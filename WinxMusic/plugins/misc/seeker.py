@@ -2,9 +2,8 @@ import asyncio
 import time
 from datetime import datetime, timedelta
 
-from pyrogram.types import InlineKeyboardMarkup
-
-from WinxMusic.core.call import Winx
+import config
+from WinxMusic.core.call import Winx, call_participants
 from WinxMusic.misc import db
 from WinxMusic.plugins.admins.callback import wrong
 from WinxMusic.plugins.misc.autoleave import autoend
@@ -17,30 +16,14 @@ from WinxMusic.utils.database import (
 )
 from WinxMusic.utils.formatters import seconds_to_min
 from WinxMusic.utils.inline import stream_markup_timer, telegram_markup_timer
+from WinxMusic.utils.stream.clock import playback_clock
+from WinxMusic.utils.stream.markup import markup_updater
 from strings import get_string
 
 checker = {}
 muted = {}
 
 
-async def timer():
-    while not await asyncio.sleep(1):
-        active_chats = await get_active_chats()
-        for chat_id in active_chats:
-            if not await is_music_playing(chat_id):
-                continue
-            playing = db.get(chat_id)
-            if not playing:
-                continue
-            file_path = playing[0]["file"]
-            if "index_" in file_path or "live_" in file_path:
-                continue
-            duration = int(playing[0]["seconds"])
-            if duration == 0:
-                continue
-            db[chat_id][0]["played"] += 1
-
-
 async def leave_if_muted():
     while True:
         await asyncio.sleep(2)
@@ -49,12 +32,8 @@ async def leave_if_muted():
                 _ = details["_"]
                 try:
                     userbot = await get_assistant(chat_id)
-                    members = []
                     try:
-                        async for member in userbot.get_call_members(chat_id):
-                            if member is None:
-                                continue
-                            members.append(member)
+                        members = await call_participants.get(chat_id)
                     except ValueError:
                         try:
                             await Winx.stop_stream(chat_id)
@@ -62,12 +41,10 @@ async def leave_if_muted():
                             pass
                         continue
 
-                    m = next((m for m in members if m.chat.id == userbot.id), None)
-                    if m is None:
+                    if userbot.id not in members:
                         continue
-                    is_muted = bool(m.is_muted and not m.can_self_unmute)
 
-                    if is_muted:
+                    if members[userbot.id]:
                         await Winx.stop_stream(chat_id)
                         await set_loop(chat_id, 0)
 
@@ -76,108 +53,110 @@ async def leave_if_muted():
                     del muted[chat_id]
 
 
-async def markup_timer():
-    while True:
-        await asyncio.sleep(2)
-        active_chats = await get_active_chats()
-        for chat_id in active_chats:
-            if not await is_music_playing(chat_id):
-                continue
+async def update_markup(chat_id: int):
+    if not await is_music_playing(chat_id):
+        return
 
-            playing = db.get(chat_id)
-            if not playing:
-                continue
+    playing = db.get(chat_id)
+    if not playing:
+        return
 
-            duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = int(playing[0]["seconds"])
 
-            try:
-                language = await get_lang(chat_id)
-                _ = get_string(language)
-            except Exception:
-                _ = get_string("pt")
+    try:
+        language = await get_lang(chat_id)
+        _ = get_string(language)
+    except Exception:
+        _ = get_string("pt")
 
-            is_muted = False
+    try:
+        userbot = await get_assistant(chat_id)
+        try:
+            members = await call_participants.get(chat_id)
+        except ValueError:
             try:
-                userbot = await get_assistant(chat_id)
-                members = []
-                try:
-                    async for member in userbot.get_call_members(chat_id):
-                        if member is None:
-                            continue
-                        members.append(member)
-                except ValueError:
-                    try:
-                        await Winx.stop_stream(chat_id)
-                    except Exception:
-                        pass
-                    continue
-
-                if not members:
-                    await Winx.stop_stream(chat_id)
-                    await set_loop(chat_id, 0)
-                    continue
-
-                if len(members) <= 1 and chat_id not in autoend:
-                    autoend[chat_id] = datetime.now() + timedelta(seconds=30)
-
-                m = next((m for m in members if m.chat.id == userbot.id), None)
-                if m is None:
-                    continue
-
-                is_muted = bool(m.is_muted and not m.can_self_unmute)
-                if is_muted:
-
-                    if chat_id not in muted:
-                        muted[chat_id] = {
-                            "timestamp": time.time(),
-                            "_": _,
-                        }
-
+                await Winx.stop_stream(chat_id)
             except Exception:
                 pass
+            return
+
+        if not members:
+            await Winx.stop_stream(chat_id)
+            await set_loop(chat_id, 0)
+            return
+
+        if len(members) <= 1 and chat_id not in autoend:
+            autoend[chat_id] = datetime.now() + timedelta(seconds=30)
+
+        if userbot.id not in members:
+            return
+
+        if members[userbot.id] and chat_id not in muted:
+            muted[chat_id] = {
+                "timestamp": time.time(),
+                "_": _,
+            }
+    except Exception:
+        pass
+
+    if duration_seconds == 0:
+        return
+
+    played = playback_clock.played(chat_id, duration_seconds)
+
+    try:
+        mystic = playing[0]["mystic"]
+        markup = playing[0]["markup"]
+    except Exception:
+        return
+
+    try:
+        check = wrong[chat_id][mystic.id]
+        if check is False:
+            return
+    except Exception:
+        pass
+
+    try:
+        buttons = (
+            stream_markup_timer(
+                _,
+                playing[0]["vidid"],
+                chat_id,
+                seconds_to_min(played),
+                playing[0]["dur"],
+            )
+            if markup == "stream"
+            else telegram_markup_timer(
+                _,
+                chat_id,
+                seconds_to_min(played),
+                playing[0]["dur"],
+            )
+        )
+    except Exception:
+        return
+    await markup_updater.update(chat_id, mystic, buttons)
 
-            if duration_seconds == 0:
-                continue
-
-            try:
-                mystic = playing[0]["mystic"]
-                markup = playing[0]["markup"]
-            except Exception:
-                continue
 
+async def markup_timer():
+    while True:
+        active_chats = list(await get_active_chats())
+        for chat_id in set(markup_updater.rendered) - set(active_chats):
+            markup_updater.forget(chat_id)
+        if not active_chats:
+            await asyncio.sleep(2)
+            continue
+        # Spread the chats over the window instead of editing them all at once
+        delay = config.MARKUP_UPDATE_WINDOW / len(active_chats)
+        for chat_id in active_chats:
+            started = time.monotonic()
             try:
-                check = wrong[chat_id][mystic.id]
-                if check is False:
-                    continue
+                await update_markup(chat_id)
             except Exception:
                 pass
-
-            try:
-                buttons = (
-                    stream_markup_timer(
-                        _,
-                        playing[0]["vidid"],
-                        chat_id,
-                        seconds_to_min(playing[0]["played"]),
-                        playing[0]["dur"],
-                    )
-                    if markup == "stream"
-                    else telegram_markup_timer(
-                        _,
-                        chat_id,
-                        seconds_to_min(playing[0]["played"]),
-                        playing[0]["dur"],
-                    )
-                )
-
-                await mystic.edit_reply_markup(
-                    reply_markup=InlineKeyboardMarkup(buttons)
-                )
-
-            except Exception:
-                continue
+            await asyncio.sleep(max(0, delay - (time.monotonic() - started)))
 
 
-asyncio.create_task(timer(), name="timer")
 asyncio.create_task(markup_timer(), name="markup_timer")
 asyncio.create_task(leave_if_muted(), name="leave_if_muted")
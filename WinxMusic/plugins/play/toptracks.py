@@ -4,11 +4,7 @@ from pyrogram import filters
 from pyrogram.types import InlineKeyboardMarkup
 
 from WinxMusic import app
-from WinxMusic.utils.database import (
-    get_global_tops,
-    get_particulars,
-    get_userss,
-)
+from WinxMusic.utils.database.leaderboard import leaderboards
 from WinxMusic.utils.decorators import language_cb
 from WinxMusic.utils.inline.playlist import (
     botplaylist_markup,
@@ -66,11 +62,13 @@ async def server_to_play(client, CallbackQuery, _):
     )
     upl = failed_top_markup(_)
     if what == "Global":
-        stats = await get_global_tops()
+        stats = (await leaderboards.tracks("global"))["items"]
     elif what == "Group":
-        stats = await get_particulars(chat_id)
+        stats = (await leaderboards.tracks("chat", chat_id))["items"]
     elif what == "Personal":
-        stats = await get_userss(CallbackQuery.from_user.id)
+        stats = (await leaderboards.tracks("user", CallbackQuery.from_user.id))[
+            "items"
+        ]
     if not stats:
         return await mystic.edit(_["tracks_2"].format(what), reply_markup=upl)
 
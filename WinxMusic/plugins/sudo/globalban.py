@@ -8,10 +8,11 @@ from WinxMusic.misc import SUDOERS
 from WinxMusic.utils import get_readable_time
 from WinxMusic.utils.database import (
     add_banned_user,
+    count_served_chats,
     get_banned_count,
     get_banned_users,
-    get_served_chats,
     is_banned_user,
+    iter_served_chats,
     remove_banned_user,
 )
 from WinxMusic.utils.decorators.language import language
@@ -43,15 +44,11 @@ async def gbanuser(client, message: Message, _):
         return await message.reply_text(_["gban_4"].format(mention))
     if user_id not in BANNED_USERS:
         BANNED_USERS.add(user_id)
-    served_chats = []
-    chats = await get_served_chats()
-    for chat in chats:
-        served_chats.append(int(chat["chat_id"]))
-    time_expected = len(served_chats)
+    time_expected = await count_served_chats()
     time_expected = get_readable_time(time_expected)
     mystic = await message.reply_text(_["gban_5"].format(mention, time_expected))
     number_of_chats = 0
-    for chat_id in served_chats:
+    async for chat_id in iter_served_chats():
         try:
             await app.ban_chat_member(chat_id, user_id)
             number_of_chats += 1
@@ -82,15 +79,11 @@ async def gungabn(client, message: Message, _):
         return await message.reply_text(_["gban_7"].format(mention))
     if user_id in BANNED_USERS:
         BANNED_USERS.remove(user_id)
-    served_chats = []
-    chats = await get_served_chats()
-    for chat in chats:
-        served_chats.append(int(chat["chat_id"]))
-    time_expected = len(served_chats)
+    time_expected = await count_served_chats()
     time_expected = get_readable_time(time_expected)
     mystic = await message.reply_text(_["gban_8"].format(mention, time_expected))
     number_of_chats = 0
-    for chat_id in served_chats:
+    async for chat_id in iter_served_chats():
         try:
             await app.unban_chat_member(chat_id, user_id)
             number_of_chats += 1
@@ -4,6 +4,7 @@ from pyrogram.types import Message
 from WinxMusic import app
 from WinxMusic.misc import SUDOERS, db
 from WinxMusic.utils.database.memorydatabase import (
+    active_sessions,
     get_active_chats,
     get_active_video_chats,
     remove_active_chat,
@@ -75,5 +76,7 @@ async def activevi_(_, message: Message):
 
 @app.on_message(command("AC_COMMAND") & SUDOERS)
 async def vc(client, message: Message):
-    ac_audio = str(len(await get_active_chats()))
-    await message.reply_text(f"Active Chats info: {ac_audio}")
+    sessions = active_sessions.get_stats()
+    await message.reply_text(
+        f"Active Chats info: {sessions['active']} ({sessions['video']} video)"
+    )
@@ -4,13 +4,12 @@ import os
 from datetime import datetime
 
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import OperationFailure
 from pyrogram import filters
 from pyrogram.errors import FloodWait
 
 from WinxMusic import app
-from WinxMusic.core.mongo import DB_NAME
+from WinxMusic.core.mongo import DB_NAME, mongo_client
 from config import BANNED_USERS, MONGO_DB_URI, OWNER_ID
 
 
@@ -65,14 +64,13 @@ async def export_database(client, message):
             "**Due to some privacy Issue, You can't Import/Export when you are using Cache Database\n\n Please Fill Your MONGO_DB_URI in vars to use this features**"
         )
     mystic = await message.reply_text("Exporting Your Mongo DB database...")
-    _mongo_async_ = AsyncIOMotorClient(MONGO_DB_URI)
-    databases = await _mongo_async_.list_database_names()
+    databases = await mongo_client.list_database_names()
 
     for db_name in databases:
         if db_name in ["local", "admin", DB_NAME]:
             continue
 
-        db = _mongo_async_[db_name]
+        db = mongo_client[db_name]
         mystic = await edit_or_reply(
             mystic,
             f"Found Data of {db_name} Database. **Uploading** and **Deleting**...",
@@ -87,7 +85,7 @@ async def export_database(client, message):
         except FloodWait as e:
             await asyncio.sleep(e.value)
         try:
-            await drop_db(_mongo_async_, db_name)
+            await drop_db(mongo_client, db_name)
         except OperationFailure:
             mystic = await edit_or_reply(
                 mystic,
@@ -98,7 +96,7 @@ async def export_database(client, message):
         except Exception:
             pass
 
-    db = _mongo_async_[DB_NAME]
+    db = mongo_client[DB_NAME]
     mystic = await edit_or_reply(mystic, f"Please Wait...\nExporting data of Your Bot")
 
     async def progress(current, total):
@@ -158,8 +156,7 @@ async def import_database(client, message):
             mystic, "Invalid Data Format Please Provide A Valid Exported File"
         )
 
-    _mongo_async_ = AsyncIOMotorClient(MONGO_DB_URI)
-    db = _mongo_async_[DB_NAME]
+    db = mongo_client[DB_NAME]
 
     try:
         for collection_name, documents in data.items():
@@ -11,6 +11,7 @@ from WinxMusic.utils import WinxBin, get_channeplay_cb, seconds_to_min
 from WinxMusic.utils.database import get_cmode, is_active_chat, is_music_playing
 from WinxMusic.utils.decorators.language import language, language_cb
 from WinxMusic.utils.inline.queue import queue_back_markup, queue_markup
+from WinxMusic.utils.stream.clock import playback_clock
 from config import BANNED_USERS
 from strings import get_command
 
@@ -103,7 +104,7 @@ async def ping_com(_client: Client, message: Message, _):
             DUR,
             "c" if cplay else "g",
             videoid,
-            seconds_to_min(got[0]["played"]),
+            seconds_to_min(playback_clock.played(chat_id, got[0]["seconds"])),
             got[0]["dur"],
         )
     )
@@ -122,7 +123,11 @@ async def ping_com(_client: Client, message: Message, _):
                                     DUR,
                                     "c" if cplay else "g",
                                     videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
+                                    seconds_to_min(
+                                        playback_clock.played(
+                                            chat_id, db[chat_id][0]["seconds"]
+                                        )
+                                    ),
                                     db[chat_id][0]["dur"],
                                 )
                                 await mystic.edit_reply_markup(reply_markup=buttons)
@@ -266,7 +271,7 @@ async def queue_back(_client: Client, callback_query: CallbackQuery, _):
             DUR,
             cplay,
             videoid,
-            seconds_to_min(got[0]["played"]),
+            seconds_to_min(playback_clock.played(chat_id, got[0]["seconds"])),
             got[0]["dur"],
         )
     )
@@ -287,7 +292,11 @@ async def queue_back(_client: Client, callback_query: CallbackQuery, _):
                                     DUR,
                                     cplay,
                                     videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
+                                    seconds_to_min(
+                                        playback_clock.played(
+                                            chat_id, db[chat_id][0]["seconds"]
+                                        )
+                                    ),
                                     db[chat_id][0]["dur"],
                                 )
                                 await mystic.edit_reply_markup(reply_markup=buttons)
@@ -1,7 +1,6 @@
 import os
 import re
 
-import yt_dlp
 from pykeyboard import InlineKeyboard
 from pyrogram import enums, filters
 from pyrogram.types import (
@@ -13,7 +12,7 @@ from pyrogram.types import (
 )
 
 from WinxMusic import Platform, app
-from WinxMusic.platforms.Youtube import cookies
+from WinxMusic.platforms.Youtube import ytdl_pool
 from WinxMusic.utils.decorators.language import language, language_cb
 from WinxMusic.utils.formatters import convert_bytes
 from WinxMusic.utils.inline.song import song_markup
@@ -290,9 +289,7 @@ async def song_download_cb(client, CallbackQuery, _):
 
     yturl = f"https://www.youtube.com/watch?v={vidid}"
 
-    with yt_dlp.YoutubeDL({"quiet": True, "cookiefile": f"{cookies()}"}) as ytdl:
-
-        x = ytdl.extract_info(yturl, download=False)
+    x = await ytdl_pool.extract_info(yturl)
 
     title = (x["title"]).title()
 
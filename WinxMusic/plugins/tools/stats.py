@@ -1,5 +1,6 @@
 import asyncio
 import platform
+import time
 from sys import version as pyver
 
 import psutil
@@ -11,18 +12,25 @@ from pytgcalls.__version__ import __version__ as pytgver
 
 import config
 from WinxMusic import Platform, app
+from WinxMusic.core.mongo import mongodb, pool_stats, query_monitor
 from WinxMusic.core.userbot import assistants
-from WinxMusic.misc import SUDOERS, pymongodb
+from WinxMusic.misc import SUDOERS
+from WinxMusic.platforms.Youtube import cookie_pool, download_pool, ytdl_pool
+from WinxMusic.utils.cache.downloads import download_store
+from WinxMusic.utils.cache.metadata import metadata_cache
+from WinxMusic.utils.cache.streams import stream_urls
 from WinxMusic.utils.database import (
-    get_global_tops,
-    get_particulars,
+    active_sessions,
+    assistant_load,
+    count_served_chats,
+    count_served_users,
     get_queries,
-    get_served_chats,
-    get_served_users,
     get_sudoers,
-    get_top_chats,
-    get_topp_users,
+    registries,
+    settings_cache,
 )
+from WinxMusic.utils.database.leaderboard import leaderboards
+from WinxMusic.utils.decorators.asyncify import executors
 from WinxMusic.utils.decorators.language import language, language_cb
 from WinxMusic.utils.inline.stats import (
     back_stats_buttons,
@@ -32,6 +40,7 @@ from WinxMusic.utils.inline.stats import (
     stats_buttons,
     top_ten_stats_markup,
 )
+from WinxMusic.utils.stream.markup import markup_updater
 from config import BANNED_USERS, PREFIXES
 from strings import get_command
 
@@ -56,7 +65,7 @@ async def stats_global(_client: Client, message: Message, _):
 @language
 async def gstats_global(_client: Client, message: Message, _):
     mystic = await message.reply_text(_["gstats_1"] + " ⏳")
-    stats = await get_global_tops()
+    stats = (await leaderboards.tracks("global"))["items"]
     if not stats:
         await asyncio.sleep(1)
         return await mystic.edit(_["gstats_2"] + " 🚫")
@@ -128,13 +137,14 @@ async def top_users_ten(_client: Client, callback_query: CallbackQuery, _):
         + " 🔝"
     )
     if what == "Tracks":
-        stats = await get_global_tops()
+        board = await leaderboards.tracks("global")
     elif what == "Chats":
-        stats = await get_top_chats()
+        board = await leaderboards.owners("chat")
     elif what == "Users":
-        stats = await get_topp_users()
+        board = await leaderboards.owners("user")
     elif what == "Here":
-        stats = await get_particulars(chat_id)
+        board = await leaderboards.tracks("chat", chat_id)
+    stats, totals = board["items"], board["totals"]
     if not stats:
         await asyncio.sleep(1)
         return await mystic.edit(_["gstats_2"] + " 🚫", reply_markup=upl)
@@ -156,12 +166,10 @@ async def top_users_ten(_client: Client, callback_query: CallbackQuery, _):
             return mystic.edit(_["gstats_2"] + " 🚫", reply_markup=upl)
         msg = ""
         limit = 0
-        total_count = 0
         if what in ["Tracks", "Here"]:
             for items, count in list_arranged.items():
-                total_count += count
                 if limit == 10:
-                    continue
+                    break
                 limit += 1
                 details = stats.get(items)
                 title = (details["title"][:35]).title()
@@ -174,12 +182,12 @@ async def top_users_ten(_client: Client, callback_query: CallbackQuery, _):
                 _["gstats_4"].format(
                     queries,
                     app.mention,
-                    len(stats),
-                    total_count,
+                    totals["tracks"],
+                    totals["spot"],
                     limit,
                 )
                 if what == "Tracks"
-                else _["gstats_7"].format(len(stats), total_count, limit)
+                else _["gstats_7"].format(totals["tracks"], totals["spot"], limit)
             )
             msg = temp + msg
         return msg, list_arranged
@@ -213,6 +221,7 @@ async def top_users_ten(_client: Client, callback_query: CallbackQuery, _):
             else _["gstats_6"].format(limit, app.mention)
         )
         msg = temp + msg
+    msg += _["gstats_12"].format(int(time.time() - board["updated"]))
     med = InputMediaPhoto(media=config.GLOBAL_IMG_URL, caption=msg + " 🎧")
     try:
         await callback_query.edit_message_media(media=med, reply_markup=upl)
@@ -236,8 +245,8 @@ async def overall_stats(_client: Client, callback_query: CallbackQuery, _):
     except Exception:
         pass
     await callback_query.edit_message_text(_["gstats_8"] + " 📈")
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
+    served_chats = await count_served_chats()
+    served_users = await count_served_users()
     total_queries = await get_queries()
     blocked = len(BANNED_USERS)
     sudoers = len(SUDOERS)
@@ -254,12 +263,12 @@ async def overall_stats(_client: Client, callback_query: CallbackQuery, _):
     text = f"""📊 **Bot Statistics and Information:**
 
 🧩 **Imported Modules:** {mod}
-👥 **Served Chats:** {served_chats} 
-👤 **Served Users:** {served_users} 
-🚫 **Blocked Users:** {blocked} 
-🔑 **Sudo Users:** {sudoers} 
+👥 **Served Chats:** {served_chats}
+👤 **Served Users:** {served_users}
+🚫 **Blocked Users:** {blocked}
+🔑 **Sudo Users:** {sudoers}
 
-🔍 **Total Queries:** {total_queries} 
+🔍 **Total Queries:** {total_queries}
 🤖 **Total Assistants:** {assistant}
 💨 **Auto-Leaving Assistant:** {ass}
 
@@ -276,6 +285,51 @@ async def overall_stats(_client: Client, callback_query: CallbackQuery, _):
         )
 
 
+async def runtime_stats() -> str:
+    """Counters of the caches, pools and workers, for the sudo stats page."""
+    ytcache = metadata_cache.get_stats()
+    dlcache = download_store.get_stats()
+    urlcache = stream_urls.get_stats()
+    markups = markup_updater.get_stats()
+    boards = leaderboards.get_stats()
+    settings = settings_cache.get_stats()
+    sessions = active_sessions.get_stats()
+    pool = pool_stats.get_stats()
+    queries = query_monitor.get_stats()
+    known = [r.get_stats() for r in registries.values()]
+    lookups = ytdl_pool.get_stats()
+    pools = ", ".join(
+        f"{name} {e['running']}/{e['workers']} (+{e['queued']} queued, {e['avg_latency'] * 1000:.0f} ms avg)"
+        for name, e in ((name, ex.get_stats()) for name, ex in executors.items())
+    )
+    downloads = download_pool.get_stats()
+    cookie_files = ", ".join(
+        f"{name}: {c['successes']}/{c['successes'] + c['failures']} ok, {c['latency']:.1f}s"
+        + (f" (quarantined {c['quarantined']}s)" if c["quarantined"] else "")
+        for name, c in cookie_pool.get_stats().items()
+    )
+    load = ", ".join(
+        f"#{num}: {a['calls']} calls{'' if a['healthy'] else ' (cooling down)'}"
+        for num, a in (await assistant_load.get_stats()).items()
+    )
+    return f"""⏱ **Runtime Counters:**
+
+⚡ **YouTube Metadata Cache:** {ytcache['hits']} hits / {ytcache['misses']} misses ({ytcache['size']}/{ytcache['max_size']} cached)
+💿 **Download Cache:** {dlcache['files']} files, {dlcache['size'] / (1024.0 ** 2):.1f} MB ({dlcache['hits']} hits / {dlcache['misses']} misses)
+🔗 **Stream URL Cache:** {urlcache['size']} urls, {urlcache['hits']} hits / {urlcache['misses']} misses, {urlcache['refreshes']} refreshed early
+🎛 **Player Updates:** {markups['edits']} edits, {markups['skipped']} skipped, {markups['flood_waits']} flood waits
+🤖 **Assistant Load:** {load}
+🏆 **Leaderboards:** {boards['boards']} cached, {boards['hits']} hits / {boards['loads']} loads
+⚙️ **Chat Settings Cache:** {settings['hit_rate']:.1%} hit rate ({settings['hits']} hits / {settings['misses']} misses)
+🎙 **Voice Chats:** {sessions['active']} active ({sessions['video']} video), peak {sessions['peak']}, {sessions['started']} since start
+🔌 **Database Pool:** {pool['in_use']}/{pool['max_size']} in use (peak {pool['peak']}), {pool['open']} open, {pool['avg_wait'] * 1000:.1f} ms avg wait, {pool['failed']} failed checkouts
+🐢 **Slow Queries:** {queries['slow']} slow, {queries['unindexed']} unindexed query shapes
+📇 **Registrations:** {sum(r['known'] for r in known)} known ids, {sum(r['hits'] for r in known)} skipped / {sum(r['writes'] for r in known)} written
+🧰 **yt-dlp Workers:** lookups {lookups['busy']}/{lookups['workers']} busy, {lookups['waiting']} waiting ({lookups['jobs']} jobs, {lookups['timeouts']} timeouts), downloads {downloads['busy']}/{downloads['workers']} busy, {downloads['waiting']} waiting ({downloads['jobs']} jobs, {downloads['timeouts']} timeouts)
+🍪 **Cookies:** {cookie_files or "none"}
+🧵 **Executors:** {pools}"""
+
+
 @app.on_callback_query(filters.regex("bot_stats_sudo"))
 @language_cb
 async def overall_stats(_client: Client, callback_query: CallbackQuery, _):
@@ -314,16 +368,15 @@ async def overall_stats(_client: Client, callback_query: CallbackQuery, _):
     free = hdd.free / (1024.0 ** 3)
     free = str(free)
     mod = int(app.loaded_plug_counts)
-    db = pymongodb
-    call = db.command("dbstats")
+    call = await mongodb.command("dbstats")
     datasize = call["dataSize"] / 1024
     datasize = str(datasize)
     storage = call["storageSize"] / 1024
     objects = call["objects"]
     collections = call["collections"]
 
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
+    served_chats = await count_served_chats()
+    served_users = await count_served_users()
     total_queries = await get_queries()
     blocked = len(BANNED_USERS)
     sudoers = len(await get_sudoers())
@@ -343,15 +396,15 @@ async def overall_stats(_client: Client, callback_query: CallbackQuery, _):
 💽 **Used Storage:** {used[:4]} GiB
 📂 **Free Storage:** {free[:4]} GiB
 
-👥 **Served Chats:** {served_chats} 
-👤 **Served Users:** {served_users} 
-🚫 **Blocked Users:** {blocked} 
-🔑 **Sudo Users:** {sudoers} 
+👥 **Served Chats:** {served_chats}
+👤 **Served Users:** {served_users}
+🚫 **Blocked Users:** {blocked}
+🔑 **Sudo Users:** {sudoers}
 
 🗄️ **Total Database Storage:** {storage} MB
 🗃️ **Total Database Collections:** {collections}
 🔑 **Total Database Keys:** {objects}
-🔍 **Total Bot Queries:** {total_queries} """
+🔍 **Total Bot Queries:** {total_queries}"""
     med = InputMediaPhoto(media=config.STATS_IMG_URL, caption=text)
     try:
         await callback_query.edit_message_media(media=med, reply_markup=upl)
@@ -359,6 +412,8 @@ async def overall_stats(_client: Client, callback_query: CallbackQuery, _):
         await callback_query.message.reply_photo(
             photo=config.STATS_IMG_URL, caption=text, reply_markup=upl
         )
+    # Too long for a caption, sent as a text message of its own
+    await callback_query.message.reply_text(await runtime_stats())
 
 
 @app.on_callback_query(
@@ -15,16 +15,19 @@ class CacheManager:
         self.max_size = max_size
         self.ttl = ttl
         self.order = collections.OrderedDict()  # To keep track of the insertion order
+        self.hits = 0
+        self.misses = 0
 
     def set(self, key, value):
         # LOGGER(__name__).info(f"Setting cache key: {key}")
         current_time = time.time()
-        if len(self.cache) >= self.max_size:
-            # Evict the oldest item when the cache reaches its maximum size
+        if key not in self.cache and len(self.cache) >= self.max_size:
+            # Evict the least recently used item when the cache reaches its maximum size
             self._evict()
 
         self.cache[key] = {"value": value, "timestamp": current_time}
-        self.order[key] = current_time  # Keeps track of insertion order
+        self.order[key] = current_time  # Keeps track of usage order
+        self.order.move_to_end(key)
 
     def get(self, key):
         # LOGGER(__name__).info(f"Getting cache key: {key}")
@@ -35,9 +38,13 @@ class CacheManager:
             # If the item has expired, remove it
             if self.ttl and current_time - item["timestamp"] > self.ttl:
                 self.delete(key)
+                self.misses += 1
                 return None
 
+            self.order.move_to_end(key)
+            self.hits += 1
             return item["value"]
+        self.misses += 1
         return None
 
     def delete(self, key):
@@ -53,7 +60,7 @@ class CacheManager:
 
     def _evict(self):
         """
-        Removes the oldest item from the cache.
+        Removes the least recently used item from the cache.
         """
         if self.order:
             oldest_key = next(iter(self.order))
@@ -65,6 +72,17 @@ class CacheManager:
         """
         return len(self.cache)
 
+    def get_stats(self):
+        """
+        Returns the hit/miss counters and current size of the cache.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.cache),
+            "max_size": self.max_size,
+        }
+
     def set_ttl(self, ttl):
         """
         Sets a global TTL (Time-To-Live) for cache items.
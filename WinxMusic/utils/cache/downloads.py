@@ -0,0 +1,186 @@
+import collections
+import json
+import os
+import threading
+import time
+
+import config
+from WinxMusic.logging import LOGGER
+
+
+class DownloadStore:
+    def __init__(self, index_path, max_size=None, delay: float = 2.0):
+        """
+        Index of the media files kept in ``downloads/``.
+
+        Files are addressed by a content key such as ``youtube:<id>:audio`` so a track
+        can be reused without asking its platform for the file name again. When the
+        files outgrow ``max_size`` bytes, the least recently used ones that no queue
+        holds a reference to are deleted. The index is saved to ``index_path`` so hot
+        tracks survive restarts; changes made within ``delay`` seconds are written
+        together from a timer thread, never from the caller.
+
+        :param index_path: JSON file the index is persisted to.
+        :param max_size: Disk budget in bytes (default None, no eviction).
+        :param delay: Seconds a save waits for further changes (default 2.0).
+        """
+        self.index_path = index_path
+        self.max_size = max_size
+        self.entries = collections.OrderedDict()  # key -> entry, least recent first
+        self.paths = {}  # path -> key
+        self.refs = collections.Counter()  # path -> queue references
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.RLock()
+        self.delay = delay
+        self.timer = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r") as file:
+                entries = json.load(file)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not load download index: {e}")
+            return
+        for key, entry in sorted(entries.items(), key=lambda i: i[1]["last_used"]):
+            if not os.path.exists(entry["path"]):
+                continue
+            self.entries[key] = entry
+            self.paths[entry["path"]] = key
+            self.size += entry["size"]
+
+    def _save(self):
+        # Called with the lock held
+        if self.timer is None:
+            self.timer = threading.Timer(self.delay, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        """Writes the index now, used by the save timer and on shutdown."""
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            text = json.dumps(self.entries)
+        temp_path = f"{self.index_path}.tmp"
+        try:
+            with open(temp_path, "w") as file:
+                file.write(text)
+            os.replace(temp_path, self.index_path)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not save download index: {e}")
+
+    def _drop(self, key):
+        entry = self.entries.pop(key)
+        self.paths.pop(entry["path"], None)
+        self.size -= entry["size"]
+        return entry
+
+    def has(self, key) -> bool:
+        entry = self.entries.get(key)
+        return bool(entry) and os.path.exists(entry["path"])
+
+    def get(self, key):
+        """Returns the path stored for ``key`` if the file is still on disk."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and not os.path.exists(entry["path"]):
+                self._drop(key)
+                entry = None
+            if not entry:
+                self.misses += 1
+                return None
+            entry["hits"] += 1
+            entry["last_used"] = time.time()
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry["path"]
+
+    def put(self, key, path):
+        """Registers a freshly downloaded file and evicts cold files if needed."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return path
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = {
+                "path": path,
+                "size": size,
+                "hits": 0,
+                "last_used": time.time(),
+            }
+            self.paths[path] = key
+            self.size += size
+            self._evict()
+            self._save()
+        return path
+
+    def managed(self, path) -> bool:
+        return path in self.paths
+
+    def acquire(self, path):
+        """Marks ``path`` as held by a queue so it is never evicted while queued."""
+        with self.lock:
+            key = self.paths.get(path)
+            if key is None:
+                return
+            self.refs[path] += 1
+            self.entries[key]["last_used"] = time.time()
+            self.entries.move_to_end(key)
+
+    def release(self, path):
+        with self.lock:
+            if self.refs[path] <= 1:
+                del self.refs[path]
+            else:
+                self.refs[path] -= 1
+
+    def held_size(self) -> int:
+        """Bytes of the files queues hold, which eviction can't reclaim."""
+        with self.lock:
+            return sum(
+                self.entries[self.paths[path]]["size"]
+                for path in self.refs
+                if path in self.paths
+            )
+
+    def _evict(self):
+        if not self.max_size or self.size <= self.max_size:
+            return
+        # The newest entry is the file that was just downloaded, never evict it
+        for key in list(self.entries)[:-1]:
+            if self.size <= self.max_size:
+                break
+            path = self.entries[key]["path"]
+            if self.refs[path] > 0:
+                continue
+            self._drop(key)
+            self.evictions += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get_stats(self):
+        return {
+            "files": len(self.entries),
+            "size": self.size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+download_store = DownloadStore(
+    os.path.join(config.TEMP_DB_FOLDER, "downloads.json"),
+    max_size=config.DOWNLOAD_CACHE_LIMIT * 1024 * 1024,
+)
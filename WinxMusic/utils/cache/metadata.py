@@ -0,0 +1,178 @@
+import asyncio
+import inspect
+import re
+from datetime import datetime
+from functools import wraps
+
+import config
+from WinxMusic.core.mongo import mongodb
+from WinxMusic.logging import LOGGER
+from .cache_manager import CacheManager
+
+VIDEO_ID = re.compile(r"^[0-9A-Za-z_-]{11}$")
+VIDEO_ID_IN_URL = re.compile(
+    r"(?:v=|youtu\.be/|shorts/|embed/|live/)([0-9A-Za-z_-]{11})"
+)
+PLAYLIST_ID_IN_URL = re.compile(r"list=([0-9A-Za-z_-]+)")
+
+
+def normalize_video_id(link: str) -> str:
+    """
+    Returns the YouTube video (or playlist) id contained in ``link``.
+
+    Bare ids and any of the usual YouTube url shapes collapse onto the same id, so
+    ``details(vidid, True)`` and ``details(url)`` share one cache entry. Anything
+    else (free text searches) is returned stripped and whitespace-collapsed.
+    """
+    link = str(link).strip()
+    if VIDEO_ID.match(link):
+        return link
+    match = VIDEO_ID_IN_URL.search(link)
+    if match:
+        return match.group(1)
+    match = PLAYLIST_ID_IN_URL.search(link)
+    if match:
+        return match.group(1)
+    return " ".join(link.split())
+
+
+class MetadataCache:
+    def __init__(self, max_size=2000, ttl=None, persist=False, persist_ttl=None):
+        """
+        Two tier cache for YouTube metadata lookups.
+
+        :param max_size: Maximum number of lookups kept in memory.
+        :param ttl: Lifetime of in-memory entries in seconds.
+        :param persist: Also keep entries in MongoDB so they survive restarts.
+        :param persist_ttl: Lifetime of MongoDB entries in seconds.
+        """
+        self.memory = CacheManager(max_size=max_size, ttl=ttl)
+        self.collection = mongodb.ytmetadata if persist else None
+        self.persist_ttl = persist_ttl
+        self.persistent_hits = 0
+        self.coalesced = 0
+        self._inflight = {}
+        self._indexed = False
+
+    @staticmethod
+    def make_key(name, link, *extra):
+        return ":".join([name, normalize_video_id(link), *map(str, extra)])
+
+    async def _ensure_index(self):
+        if self._indexed or not self.persist_ttl:
+            return
+        self._indexed = True
+        try:
+            await self.collection.create_index(
+                "timestamp", expireAfterSeconds=self.persist_ttl
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not create metadata cache index: {e}")
+
+    async def get(self, key):
+        value = self.memory.get(key)
+        if value is not None or self.collection is None:
+            return value
+        try:
+            item = await self.collection.find_one({"_id": key})
+        except Exception:
+            return None
+        if not item:
+            return None
+        age = datetime.utcnow() - item["timestamp"]
+        if self.persist_ttl and age.total_seconds() > self.persist_ttl:
+            return None
+        value = tuple(item["value"]) if item.get("tuple") else item["value"]
+        self.persistent_hits += 1
+        self.memory.set(key, value)
+        return value
+
+    async def set(self, key, value):
+        self.memory.set(key, value)
+        if self.collection is None:
+            return
+        await self._ensure_index()
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {
+                    "$set": {
+                        "value": value,
+                        "tuple": isinstance(value, tuple),
+                        "timestamp": datetime.utcnow(),
+                    }
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not persist metadata for {key}: {e}")
+
+    async def _load(self, key, call):
+        # Runs shielded, so the value is stored even if every caller is cancelled
+        value = await call
+        if value:
+            await self.set(key, value)
+        return value
+
+    def cached(self, name, *keyed):
+        """
+        Caches the result of an async ``method(self, link, ...)``.
+
+        Entries are keyed by the normalized id of ``link`` plus the values of the
+        parameters listed in ``keyed`` (e.g. ``limit`` for playlists). Concurrent
+        misses for the same key await a single in-flight call, which finishes and
+        stores its result even if the callers are cancelled.
+        """
+
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = self.make_key(
+                    name,
+                    bound.arguments["link"],
+                    *[bound.arguments[arg] for arg in keyed],
+                )
+                value = await self.get(key)
+                if value is not None:
+                    return value
+                task = self._inflight.get(key)
+                if task is None:
+                    task = asyncio.ensure_future(
+                        self._load(key, func(*args, **kwargs))
+                    )
+                    self._inflight[key] = task
+
+                    def done(task):
+                        self._inflight.pop(key, None)
+                        if not task.cancelled():
+                            task.exception()
+
+                    task.add_done_callback(done)
+                else:
+                    self.coalesced += 1
+                return await asyncio.shield(task)
+
+            return wrapper
+
+        return decorator
+
+    def get_stats(self):
+        stats = self.memory.get_stats()
+        stats["persistent_hits"] = self.persistent_hits
+        stats["coalesced"] = self.coalesced
+        # Lookups served from MongoDB were memory misses, but not network misses
+        stats["misses"] -= self.persistent_hits
+        stats["hits"] += self.persistent_hits
+        return stats
+
+
+metadata_cache = MetadataCache(
+    max_size=config.YT_CACHE_SIZE,
+    ttl=config.YT_CACHE_TTL,
+    persist=config.YT_CACHE_PERSIST,
+    persist_ttl=config.YT_CACHE_PERSIST_TTL,
+)
@@ -0,0 +1,100 @@
+import asyncio
+import collections
+import re
+import time
+
+import config
+
+# googlevideo urls carry ``expire=<unix time>``, HLS manifests ``/expire/<unix time>/``
+EXPIRE = re.compile(r"[?&/]expire[=/](\d+)")
+
+
+class StreamUrlCache:
+    def __init__(self, ttl: int = 600, refresh: int = 600, max_size: int = 1000):
+        """
+        Direct stream urls resolved by yt-dlp, by video id and format selector.
+
+        An entry lives until the ``expire`` time embedded in its url, or ``ttl``
+        seconds when the url has none. It is only handed out while enough of its
+        life is left to cover playback (see ``get``); otherwise the request waits
+        for a new url. Up to ``refresh`` seconds before that point, the url is
+        resolved again in the background while the current one is still handed
+        out. Requests for a url being resolved wait for that one.
+        """
+        self.ttl = ttl
+        self.refresh = refresh
+        self.max_size = max_size
+        self.entries = collections.OrderedDict()  # key -> (url, loaded at, expires at)
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _expires(self, url: str, now: float) -> float:
+        match = EXPIRE.search(url)
+        if match:
+            return float(match.group(1))
+        return now + self.ttl
+
+    async def _load(self, key: tuple, loader) -> str:
+        url = await loader()
+        now = time.time()
+        self.entries[key] = (url, now, self._expires(url, now))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return url
+
+    def _fetch(self, key: tuple, loader):
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader))
+            self.inflight[key] = task
+
+            def done(task):
+                self.inflight.pop(key, None)
+                if not task.cancelled():
+                    task.exception()
+
+            task.add_done_callback(done)
+        return task
+
+    async def get(self, vidid: str, format: str, loader, min_left: int = 0) -> str:
+        """
+        Returns the url of ``vidid`` in ``format``, awaiting ``loader()`` for it when
+        there is no usable one. Failures are not cached.
+
+        A cached url is usable while at least half its lifetime is left, and at
+        least ``min_left`` seconds for playback of unknown length such as live
+        streams, so it doesn't expire mid-stream.
+        """
+        key = (vidid, format)
+        entry = self.entries.get(key)
+        now = time.time()
+        if entry:
+            url, loaded, expires = entry
+            lifetime = expires - loaded
+            needed = max(lifetime / 2, min(min_left, lifetime))
+            left = expires - now
+            if left >= needed:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                window = min(self.refresh, (lifetime - needed) / 2)
+                if left < needed + window and key not in self.inflight:
+                    self.refreshes += 1
+                    self._fetch(key, loader)
+                return url
+        self.entries.pop(key, None)
+        self.misses += 1
+        return await asyncio.shield(self._fetch(key, loader))
+
+    def get_stats(self):
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+        }
+
+
+stream_urls = StreamUrlCache(ttl=config.STREAM_URL_TTL, refresh=config.STREAM_URL_REFRESH)
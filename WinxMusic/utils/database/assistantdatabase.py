@@ -1,15 +1,102 @@
-import random
+import asyncio
+import time
 
 from pytgcalls import PyTgCalls
 
 from WinxMusic import userbot
 from WinxMusic.core.mongo import mongodb
+from WinxMusic.utils.database.memorydatabase import active_sessions
 
 db = mongodb.assistants
 
 assistantdict = {}
 
 
+class AssistantLoad:
+    def __init__(self, dialogs_ttl: int = 600, too_much_cooldown: int = 3600):
+        """
+        Picks the assistant new chats are placed on.
+
+        Assistants are ranked by whether they are cooling down after a recent
+        ``ChannelsTooMuch`` or ``FloodWait``, then by the number of active calls they
+        serve, then by how many dialogs they have joined (refreshed every
+        ``dialogs_ttl`` seconds).
+        """
+        self.dialogs_ttl = dialogs_ttl
+        self.too_much_cooldown = too_much_cooldown
+        self.dialogs = {}  # assistant -> (count, fetched at)
+        self.cooldown = {}  # assistant -> unhealthy until
+        self.events = {}  # assistant -> number of ChannelsTooMuch/FloodWait
+
+    def report(self, chat_id: int, flood_wait: int = None):
+        """
+        Records a ``FloodWait`` of ``flood_wait`` seconds, or a ``ChannelsTooMuch``
+        when it is None, for the assistant serving ``chat_id``.
+        """
+        assistant = assistantdict.get(chat_id)
+        if not assistant:
+            return
+        delay = flood_wait if flood_wait is not None else self.too_much_cooldown
+        until = time.monotonic() + delay
+        self.cooldown[assistant] = max(self.cooldown.get(assistant, 0), until)
+        self.events[assistant] = self.events.get(assistant, 0) + 1
+        if flood_wait is None:
+            # The dialog count just went stale, fetch it again on the next pick
+            self.dialogs.pop(assistant, None)
+
+    async def _dialogs(self, assistant: int) -> int:
+        cached = self.dialogs.get(assistant)
+        if cached is not None and time.monotonic() - cached[1] < self.dialogs_ttl:
+            return cached[0]
+        count = cached[0] if cached is not None else 0
+        try:
+            client = await get_client(assistant)
+            count = await client.get_dialogs_count()
+        except Exception:
+            pass
+        self.dialogs[assistant] = (count, time.monotonic())
+        return count
+
+    async def calls(self) -> dict:
+        load = {}
+        for chat_id, session in active_sessions.sessions.items():
+            assistant = session.get("assistant") or assistantdict.get(chat_id)
+            if assistant:
+                load[assistant] = load.get(assistant, 0) + 1
+        return load
+
+    async def pick(self, candidates: list) -> int:
+        calls = await self.calls()
+        dialogs = await asyncio.gather(*[self._dialogs(a) for a in candidates])
+        now = time.monotonic()
+
+        def rank(item):
+            assistant, joined = item
+            cooling = max(0, self.cooldown.get(assistant, 0) - now)
+            return cooling > 0, cooling, calls.get(assistant, 0), joined
+
+        return min(zip(candidates, dialogs), key=rank)[0]
+
+    async def get_stats(self) -> dict:
+        from WinxMusic.core.userbot import assistants
+
+        calls = await self.calls()
+        now = time.monotonic()
+        dialogs = {a: cached[0] for a, cached in self.dialogs.items()}
+        return {
+            assistant: {
+                "calls": calls.get(assistant, 0),
+                "dialogs": dialogs.get(assistant),
+                "events": self.events.get(assistant, 0),
+                "healthy": self.cooldown.get(assistant, 0) <= now,
+            }
+            for assistant in assistants
+        }
+
+
+assistant_load = AssistantLoad()
+
+
 async def get_client(assistant: int):
     clients = userbot.clients
     if 1 <= assistant <= len(userbot.clients):
@@ -28,6 +115,11 @@ async def save_assistant(chat_id, number):
     return await get_assistant(chat_id)
 
 
+async def preload_assistants():
+    async for dbassistant in db.find({}, {"_id": 0, "chat_id": 1, "assistant": 1}):
+        assistantdict.setdefault(dbassistant["chat_id"], dbassistant["assistant"])
+
+
 async def set_assistant(chat_id):
     from WinxMusic.core.userbot import assistants
 
@@ -37,9 +129,9 @@ async def set_assistant(chat_id):
     available_assistants = [assi for assi in assistants if assi != current_assistant]
 
     if len(available_assistants) <= 1:
-        ran_assistant = random.choice(assistants)
+        ran_assistant = await assistant_load.pick(assistants)
     else:
-        ran_assistant = random.choice(available_assistants)
+        ran_assistant = await assistant_load.pick(available_assistants)
 
     assistantdict[chat_id] = ran_assistant
     await db.update_one(
@@ -82,7 +174,7 @@ async def get_assistant(chat_id: int) -> str:
 async def set_calls_assistant(chat_id):
     from WinxMusic.core.userbot import assistants
 
-    ran_assistant = random.choice(assistants)
+    ran_assistant = await assistant_load.pick(assistants)
     assistantdict[chat_id] = ran_assistant
     await db.update_one(
         {"chat_id": chat_id},
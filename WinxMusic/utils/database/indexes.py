@@ -0,0 +1,102 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from WinxMusic.core.mongo import mongodb, query_monitor
+from WinxMusic.logging import LOGGER
+
+
+def _unique(field: str) -> IndexModel:
+    return IndexModel([(field, ASCENDING)], unique=True)
+
+
+# Indexes of every collection the bot queries, by collection name. Each one is
+# declared to the query monitor, so a query by other fields gets logged.
+INDEXES = {
+    # mongodatabase
+    "chats": [_unique("chat_id")],
+    "tgusersdb": [_unique("user_id")],
+    "gban": [_unique("user_id")],
+    "blockedusers": [_unique("user_id")],
+    "blacklistChat": [_unique("chat_id")],
+    "privatechats": [_unique("chat_id")],
+    "authuser": [_unique("chat_id")],
+    "playlist": [_unique("chat_id")],
+    "queries": [_unique("chat_id")],
+    "sudoers": [_unique("sudo")],
+    "trackstats": [
+        IndexModel(
+            [("scope", ASCENDING), ("owner", ASCENDING), ("vidid", ASCENDING)],
+            unique=True,
+        ),
+        IndexModel([("scope", ASCENDING), ("owner", ASCENDING), ("spot", DESCENDING)]),
+    ],
+    "statstotals": [
+        IndexModel([("scope", ASCENDING), ("owner", ASCENDING)], unique=True),
+        IndexModel([("scope", ASCENDING), ("spot", DESCENDING)]),
+    ],
+    # memorydatabase
+    "language": [_unique("chat_id")],
+    "playmode": [_unique("chat_id")],
+    "playtypedb": [_unique("chat_id")],
+    "cplaymode": [_unique("chat_id")],
+    "adminauth": [_unique("chat_id")],
+    "onoffper": [_unique("on_off")],
+    "autoend": [_unique("chat_id")],
+    "winxvideocalls": [_unique("chat_id")],
+    "notes": [_unique("chat_id")],
+    "filters": [_unique("chat_id")],
+    # assistantdatabase
+    "assistants": [_unique("chat_id")],
+}
+
+
+async def _duplicates(collection, keys: list, limit: int = 5):
+    """Returns up to ``limit`` duplicated ``keys`` values and how often each occurs."""
+    fields = [field for field, _ in keys]
+    pipeline = [
+        {"$match": {field: {"$exists": True} for field in fields}},
+        {
+            "$group": {
+                "_id": {field: f"${field}" for field in fields},
+                "count": {"$sum": 1},
+            }
+        },
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": limit},
+    ]
+    return [
+        (group["_id"], group["count"])
+        async for group in collection.aggregate(pipeline, allowDiskUse=True)
+    ]
+
+
+async def _create(collection, index: IndexModel):
+    try:
+        await collection.create_indexes([index])
+    except DuplicateKeyError:
+        # Never delete data here; the duplicates are left for the owner to resolve
+        keys = list(index.document["key"].items())
+        duplicates = await _duplicates(collection, keys)
+        LOGGER(__name__).warning(
+            f"Skipped unique index {index.document['name']} on {collection.name}, "
+            f"it has duplicated documents: "
+            + ", ".join(f"{value} x{count}" for value, count in duplicates)
+        )
+
+
+async def ensure_indexes():
+    """
+    Creates the indexes in ``INDEXES``. Existing indexes are left as they are, so
+    this is cheap to run on every start.
+    """
+    for name, indexes in INDEXES.items():
+        collection = mongodb[name]
+        for index in indexes:
+            query_monitor.declare(name, list(index.document["key"]))
+            try:
+                await _create(collection, index)
+            except OperationFailure as e:
+                LOGGER(__name__).warning(
+                    f"Could not create index {index.document['name']} on {name}: {e}"
+                )
+    LOGGER(__name__).info("Database Indexes Ready.")
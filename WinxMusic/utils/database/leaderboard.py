@@ -0,0 +1,146 @@
+import asyncio
+import collections
+import time
+
+import config
+from WinxMusic.utils.database.mongodatabase import (
+    get_global_tops,
+    get_particulars,
+    get_stats_totals,
+    get_top_chats,
+    get_topp_users,
+    get_userss,
+)
+
+TRACK_LOADERS = {
+    "global": lambda owner, limit: get_global_tops(limit=limit),
+    "chat": lambda owner, limit: get_particulars(owner, limit=limit),
+    "user": lambda owner, limit: get_userss(owner, limit=limit),
+}
+OWNER_LOADERS = {
+    "chat": lambda limit: get_top_chats(limit=limit),
+    "user": lambda limit: get_topp_users(limit=limit),
+}
+
+
+class Leaderboards:
+    def __init__(self, size: int = 11, ttl: int = 300, max_boards: int = 500):
+        """
+        Cached top-N lists for the stats and top tracks menus.
+
+        A board is loaded from MongoDB the first time it is asked for. After that
+        every play counts flush updates it in place; a board that a flush can't
+        update exactly (a track or chat outside the cached top played) is marked
+        dirty and, like any board older than ``ttl`` seconds, is served as is while
+        it is reloaded in the background.
+
+        Boards are ``{"items", "totals", "updated", "loaded"}`` dicts, ``updated``
+        being the ``time.time()`` of the data and ``loaded`` the one its read from
+        MongoDB finished at.
+        """
+        self.size = size
+        self.ttl = ttl
+        self.max_boards = max_boards
+        self.boards = collections.OrderedDict()
+        self.inflight = {}
+        self.applied = 0.0  # time.time() of the last apply
+        self.hits = 0
+        self.loads = 0
+
+    async def _load(self, key: tuple) -> dict:
+        kind, scope, owner = key
+        begun = time.time()
+        if kind == "tracks":
+            items, totals = await asyncio.gather(
+                TRACK_LOADERS[scope](owner, self.size),
+                get_stats_totals(scope, owner),
+            )
+        else:
+            items, totals = await OWNER_LOADERS[scope](self.size), None
+        self.loads += 1
+        now = time.time()
+        board = {"items": items, "totals": totals, "updated": now, "loaded": now}
+        if self.applied > begun:
+            # A flush was applied while reading, which may have missed its writes
+            board["dirty"] = True
+        self.boards[key] = board
+        self.boards.move_to_end(key)
+        while len(self.boards) > self.max_boards:
+            self.boards.popitem(last=False)
+        return board
+
+    def _refresh(self, key: tuple):
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key))
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return task
+
+    async def get(self, key: tuple) -> dict:
+        board = self.boards.get(key)
+        if board is None:
+            return await asyncio.shield(self._refresh(key))
+        self.hits += 1
+        self.boards.move_to_end(key)
+        if board.get("dirty") or time.time() - board["updated"] > self.ttl:
+            self._refresh(key)
+        return board
+
+    async def tracks(self, scope: str, owner: int = 0) -> dict:
+        """Top tracks of ``scope`` ("global", "chat" or "user") and its totals."""
+        return await self.get(("tracks", scope, owner))
+
+    async def owners(self, scope: str) -> dict:
+        """Chats or users (``scope`` "chat" or "user") with the most plays."""
+        return await self.get(("owners", scope, 0))
+
+    def _sort(self, board: dict, key):
+        board["items"] = dict(
+            sorted(board["items"].items(), key=key, reverse=True)[: self.size]
+        )
+
+    def apply(self, pending: dict, new_tracks: collections.Counter, started: float):
+        """
+        Applies a flushed ``{(scope, owner): {vidid: [plays, title]}}`` batch, in
+        which ``new_tracks`` counts the tracks played for the first time.
+
+        ``started`` is the ``time.time()`` the flush began writing at. Boards loaded
+        after that may already hold the batch; they are reloaded instead of
+        counting it twice.
+        """
+        now = time.time()
+        for (scope, owner), tracks in pending.items():
+            plays = sum(count for count, _ in tracks.values())
+            board = self.boards.get(("tracks", scope, owner))
+            if board and board["loaded"] >= started:
+                board["dirty"] = True
+            elif board:
+                items = board["items"]
+                for vidid, (count, title) in tracks.items():
+                    if vidid in items:
+                        items[vidid]["spot"] += count
+                        items[vidid]["title"] = title
+                    else:
+                        board["dirty"] = True
+                self._sort(board, lambda item: item[1]["spot"])
+                board["totals"]["spot"] += plays
+                board["totals"]["tracks"] += new_tracks[(scope, owner)]
+                board["updated"] = now
+            board = self.boards.get(("owners", scope, 0))
+            if board and board["loaded"] >= started:
+                board["dirty"] = True
+            elif board:
+                if owner in board["items"]:
+                    board["items"][owner] += plays
+                    self._sort(board, lambda item: item[1])
+                else:
+                    board["dirty"] = True
+                board["updated"] = now
+        self.applied = now
+
+    def get_stats(self):
+        return {"boards": len(self.boards), "hits": self.hits, "loads": self.loads}
+
+
+leaderboards = Leaderboards(ttl=config.LEADERBOARD_TTL)
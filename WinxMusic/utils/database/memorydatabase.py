@@ -1,5 +1,7 @@
+import asyncio
 import json
 import os
+import time
 from typing import Dict, List, Union
 
 import config
@@ -20,20 +22,166 @@ filtersdb = mongodb.filters
 
 # Shifting to memory [ mongo sucks often]
 loop = {}
-playtype = {}
-playmode = {}
-channelconnect = {}
-langm = {}
 pause = {}
 mute = {}
-active = []
-activevideo = []
-nonadmin = {}
-vlimit = []
-maintenance = []
-autoend = {}
 greeting_message = {"welcome": {}, "goodbye": {}}
 
+_MISSING = object()  # the chat has no document
+_UNCACHED = object()  # the chat was never read
+
+
+class Setting:
+    def __init__(self, collection, field: str = None, default=None, key="chat_id"):
+        """
+        A per-chat setting stored as one document per chat in ``collection``.
+
+        With ``field`` the value is ``document[field]`` and ``default`` when the chat
+        has no document. Without it the setting is a flag that is True when the
+        chat has a document.
+        """
+        self.collection = collection
+        self.field = field
+        self.default = False if field is None else default
+        self.key = key
+
+    def value(self, document):
+        if document is None:
+            return _MISSING
+        return True if self.field is None else document.get(self.field)
+
+
+class SettingsCache:
+    def __init__(self, **settings: Setting):
+        """
+        Write-through cache of per-chat settings.
+
+        Values are read from MongoDB once per chat and kept, including the absence
+        of a document. ``warm`` loads whole collections at once; after that a chat
+        missing from the cache is known to use the default and costs no read.
+        """
+        self.settings = settings
+        self.values = {name: {} for name in settings}
+        self.complete = set()
+        self.hits = dict.fromkeys(settings, 0)
+        self.misses = dict.fromkeys(settings, 0)
+
+    async def get(self, name: str, chat_id):
+        setting = self.settings[name]
+        values = self.values[name]
+        value = values.get(
+            chat_id, _MISSING if name in self.complete else _UNCACHED
+        )
+        if value is _UNCACHED:
+            self.misses[name] += 1
+            document = await setting.collection.find_one({setting.key: chat_id})
+            value = values[chat_id] = setting.value(document)
+        else:
+            self.hits[name] += 1
+        return setting.default if value is _MISSING else value
+
+    async def set(self, name: str, chat_id, value):
+        setting = self.settings[name]
+        if setting.field is None:
+            self.values[name][chat_id] = True if value else _MISSING
+            if value:
+                return await setting.collection.update_one(
+                    {setting.key: chat_id},
+                    {"$set": {setting.key: chat_id}},
+                    upsert=True,
+                )
+            return await setting.collection.delete_one({setting.key: chat_id})
+        self.values[name][chat_id] = value
+        return await setting.collection.update_one(
+            {setting.key: chat_id}, {"$set": {setting.field: value}}, upsert=True
+        )
+
+    async def warm(self, name: str):
+        setting = self.settings[name]
+        projection = {"_id": 0, setting.key: 1}
+        if setting.field:
+            projection[setting.field] = 1
+        values = {}
+        async for document in setting.collection.find({}, projection):
+            values[document[setting.key]] = setting.value(document)
+        # Keep what was read or written while the collection was loading
+        values.update(self.values[name])
+        self.values[name] = values
+        self.complete.add(name)
+
+    async def warm_all(self):
+        await asyncio.gather(*[self.warm(name) for name in self.settings])
+
+    def get_stats(self) -> dict:
+        hits = sum(self.hits.values())
+        total = hits + sum(self.misses.values())
+        return {
+            "hits": hits,
+            "misses": total - hits,
+            "hit_rate": hits / total if total else 0,
+            "size": sum(len(values) for values in self.values.values()),
+        }
+
+
+settings_cache = SettingsCache(
+    lang=Setting(langdb, "lang", "pt"),
+    playmode=Setting(playmodedb, "mode", "Direct"),
+    playtype=Setting(playtypedb, "mode", "Everyone"),
+    cmode=Setting(channeldb, "mode"),
+    nonadmin=Setting(authdb),
+    onoff=Setting(onoffdb, key="on_off"),
+    autoend=Setting(autoenddb),
+    videolimit=Setting(videodb, "limit", config.VIDEO_STREAM_LIMIT),
+)
+
+
+class SessionRegistry:
+    def __init__(self):
+        """
+        The voice chats the bot is streaming in, with O(1) membership checks.
+
+        Every session keeps when it started, its assistant, whether it streams
+        video and the bitrates it was started with.
+        """
+        self.sessions = {}
+        self.video = set()
+        self.started = 0
+        self.peak = 0
+
+    def __contains__(self, chat_id) -> bool:
+        return chat_id in self.sessions
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def add(self, chat_id: int, **details):
+        session = self.sessions.get(chat_id)
+        if session is None:
+            session = self.sessions[chat_id] = {"started": time.time()}
+            self.started += 1
+            self.peak = max(self.peak, len(self.sessions))
+        session.update(details)
+
+    def remove(self, chat_id: int):
+        self.sessions.pop(chat_id, None)
+        self.video.discard(chat_id)
+
+    def get(self, chat_id: int) -> dict:
+        return self.sessions.get(chat_id)
+
+    def chats(self) -> list:
+        return list(self.sessions)
+
+    def get_stats(self) -> dict:
+        return {
+            "active": len(self.sessions),
+            "video": len(self.video),
+            "started": self.started,
+            "peak": self.peak,
+        }
+
+
+active_sessions = SessionRegistry()
+
 
 async def get_filters_count() -> dict:
     chats_count = 0
@@ -181,32 +329,15 @@ async def is_pnote_on(chat_id) -> bool:
 
 
 async def is_autoend() -> bool:
-    chat_id = 123
-    mode = autoend.get(chat_id)
-    if not mode:
-        user = await autoenddb.find_one({"chat_id": chat_id})
-        if not user:
-            autoend[chat_id] = False
-            return False
-        autoend[chat_id] = True
-        return True
-    return mode
+    return await settings_cache.get("autoend", 123)
 
 
 async def autoend_on():
-    chat_id = 123
-    autoend[chat_id] = True
-    user = await autoenddb.find_one({"chat_id": chat_id})
-    if not user:
-        return await autoenddb.insert_one({"chat_id": chat_id})
+    return await settings_cache.set("autoend", 123, True)
 
 
 async def autoend_off():
-    chat_id = 123
-    autoend[chat_id] = False
-    user = await autoenddb.find_one({"chat_id": chat_id})
-    if user:
-        return await autoenddb.delete_one({"chat_id": chat_id})
+    return await settings_cache.set("autoend", 123, False)
 
 
 # LOOP PLAY
@@ -223,79 +354,38 @@ async def set_loop(chat_id: int, mode: int):
 
 # Channel Play IDS
 async def get_cmode(chat_id: int) -> int:
-    mode = channelconnect.get(chat_id)
-    if not mode:
-        mode = await channeldb.find_one({"chat_id": chat_id})
-        if not mode:
-            return None
-        channelconnect[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return await settings_cache.get("cmode", chat_id)
 
 
 async def set_cmode(chat_id: int, mode: int):
-    channelconnect[chat_id] = mode
-    await channeldb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await settings_cache.set("cmode", chat_id, mode)
 
 
 # PLAY TYPE WHETHER ADMINS ONLY OR EVERYONE
 async def get_playtype(chat_id: int) -> str:
-    mode = playtype.get(chat_id)
-    if not mode:
-        mode = await playtypedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playtype[chat_id] = "Everyone"
-            return "Everyone"
-        playtype[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return await settings_cache.get("playtype", chat_id)
 
 
 async def set_playtype(chat_id: int, mode: str):
-    playtype[chat_id] = mode
-    await playtypedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await settings_cache.set("playtype", chat_id, mode)
 
 
 # play mode whether inline or direct query
 async def get_playmode(chat_id: int) -> str:
-    mode = playmode.get(chat_id)
-    if not mode:
-        mode = await playmodedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playmode[chat_id] = "Direct"
-            return "Direct"
-        playmode[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return await settings_cache.get("playmode", chat_id)
 
 
 async def set_playmode(chat_id: int, mode: str):
-    playmode[chat_id] = mode
-    await playmodedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await settings_cache.set("playmode", chat_id, mode)
 
 
 # language
 async def get_lang(chat_id: int) -> str:
-    mode = langm.get(chat_id)
-    if not mode:
-        lang = await langdb.find_one({"chat_id": chat_id})
-        if not lang:
-            langm[chat_id] = "pt"
-            return "pt"
-        langm[chat_id] = lang["lang"]
-        return lang["lang"]
-    return mode
+    return await settings_cache.get("lang", chat_id)
 
 
 async def set_lang(chat_id: int, lang: str):
-    langm[chat_id] = lang
-    await langdb.update_one({"chat_id": chat_id}, {"$set": {"lang": lang}}, upsert=True)
+    await settings_cache.set("lang", chat_id, lang)
 
 
 # Muted
@@ -332,113 +422,152 @@ async def music_off(chat_id: int):
 
 # Active Voice Chats
 async def get_active_chats() -> list:
-    return active
+    return active_sessions.chats()
 
 
 async def is_active_chat(chat_id: int) -> bool:
-    if chat_id not in active:
-        return False
-    else:
-        return True
+    return chat_id in active_sessions
 
 
-async def add_active_chat(chat_id: int):
-    if chat_id not in active:
-        active.append(chat_id)
+async def add_active_chat(chat_id: int, **details):
+    active_sessions.add(
+        chat_id,
+        audio_bitrate=audio.data.get(str(chat_id), "MEDIUM"),
+        video_bitrate=video.data.get(str(chat_id), "SD_480p"),
+        **details,
+    )
 
 
 async def remove_active_chat(chat_id: int):
-    if chat_id in active:
-        active.remove(chat_id)
+    active_sessions.remove(chat_id)
 
 
 # Active Video Chats
 async def get_active_video_chats() -> list:
-    return activevideo
+    return list(active_sessions.video)
 
 
 async def is_active_video_chat(chat_id: int) -> bool:
-    if chat_id not in activevideo:
-        return False
-    else:
-        return True
+    return chat_id in active_sessions.video
 
 
 async def add_active_video_chat(chat_id: int):
-    if chat_id not in activevideo:
-        activevideo.append(chat_id)
+    active_sessions.video.add(chat_id)
+    if chat_id in active_sessions:
+        active_sessions.add(chat_id, stream_type="video")
 
 
 async def remove_active_video_chat(chat_id: int):
-    if chat_id in activevideo:
-        activevideo.remove(chat_id)
+    active_sessions.video.discard(chat_id)
+    if chat_id in active_sessions:
+        active_sessions.add(chat_id, stream_type="audio")
+
+
+# Settings kept in tempdb/
+
+
+def _write_file(path: str, text: str):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+class JsonFile:
+    def __init__(self, path: str, factory=dict, delay: float = 2.0):
+        """
+        A set or dict loaded from the JSON file at ``path``.
+
+        ``save`` only schedules a write: changes made within ``delay`` seconds are
+        written together, from the ``io`` executor, to a temporary file that then
+        replaces ``path``, so a crash leaves either the old or the new file. Writes
+        of one file never overlap.
+        """
+        self.path = path
+        self.delay = delay
+        self.task = None
+        self.lock = asyncio.Lock()
+        self.data = factory()
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as file:
+                    self.data = factory(json.load(file))
+            except Exception:
+                pass
+
+    def save(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._save_later())
+
+    async def _save_later(self):
+        await asyncio.sleep(self.delay)
+        self.task = None
+        await self.flush()
+
+    async def flush(self):
+        # Imported here, the decorators package imports this module
+        from WinxMusic.utils.decorators.asyncify import executors
+
+        async with self.lock:
+            text = json.dumps(
+                sorted(self.data) if isinstance(self.data, set) else self.data
+            )
+            await executors["io"].run(_write_file, self.path, text)
+
+
+async def flush_json_files():
+    """
+    Writes the files that still have a pending save and waits for the writes in
+    progress, used on shutdown.
+    """
+    pending = [
+        f for f in (cleanmode, command, audio, video) if f.task or f.lock.locked()
+    ]
+    for f in pending:
+        if f.task:
+            f.task.cancel()
+            f.task = None
+    await asyncio.gather(*[f.flush() for f in pending], return_exceptions=True)
 
 
 # Delete command mode
 
-# Define file paths
-CLEANMODE_DB = os.path.join(config.TEMP_DB_FOLDER, "cleanmode.json")
-COMMAND_DB = os.path.join(config.TEMP_DB_FOLDER, "command.json")
-
-
-def load_cleanmode():
-    if os.path.exists(CLEANMODE_DB):
-        with open(CLEANMODE_DB, "r") as file:
-            return json.load(file)
-    return []
-
-
-def load_command():
-    if os.path.exists(COMMAND_DB):
-        with open(COMMAND_DB, "r") as file:
-            return json.load(file)
-    return []
-
-
-def save_cleanmode():
-    with open(CLEANMODE_DB, "w") as file:
-        json.dump(cleanmode, file)
-
-
-def save_command():
-    with open(COMMAND_DB, "w") as file:
-        json.dump(command, file)
-
-
-cleanmode = load_cleanmode()
-command = load_command()
+cleanmode = JsonFile(os.path.join(config.TEMP_DB_FOLDER, "cleanmode.json"), set)
+command = JsonFile(os.path.join(config.TEMP_DB_FOLDER, "command.json"), set)
 
 
 async def is_cleanmode_on(chat_id: int) -> bool:
-    return chat_id not in cleanmode
+    return chat_id not in cleanmode.data
 
 
 async def cleanmode_off(chat_id: int):
-    if chat_id not in cleanmode:
-        cleanmode.append(chat_id)
-        save_cleanmode()
+    if chat_id not in cleanmode.data:
+        cleanmode.data.add(chat_id)
+        cleanmode.save()
 
 
 async def cleanmode_on(chat_id: int):
-    if chat_id in cleanmode:
-        cleanmode.remove(chat_id)
-        save_cleanmode()
+    if chat_id in cleanmode.data:
+        cleanmode.data.discard(chat_id)
+        cleanmode.save()
 
 
 async def is_commanddelete_on(chat_id: int) -> bool:
-    return chat_id not in command
+    return chat_id not in command.data
 
 
 async def commanddelete_off(chat_id: int):
-    if chat_id not in command:
-        command.append(chat_id)
-        save_command()
+    if chat_id not in command.data:
+        command.data.add(chat_id)
+        command.save()
 
 
 async def commanddelete_on(chat_id: int):
-    if chat_id in command:
-        command.remove(chat_id)
-        save_command()
+    if chat_id in command.data:
+        command.data.discard(chat_id)
+        command.save()
 
 
 # Non Admin Chat
@@ -450,51 +579,23 @@ async def check_nonadmin_chat(chat_id: int) -> bool:
 
 
 async def is_nonadmin_chat(chat_id: int) -> bool:
-    mode = nonadmin.get(chat_id)
-    if not mode:
-        user = await authdb.find_one({"chat_id": chat_id})
-        if not user:
-            nonadmin[chat_id] = False
-            return False
-        nonadmin[chat_id] = True
-        return True
-    return mode
+    return await settings_cache.get("nonadmin", chat_id)
 
 
 async def add_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = True
-    is_admin = await check_nonadmin_chat(chat_id)
-    if is_admin:
-        return
-    return await authdb.insert_one({"chat_id": chat_id})
+    return await settings_cache.set("nonadmin", chat_id, True)
 
 
 async def remove_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = False
-    is_admin = await check_nonadmin_chat(chat_id)
-    if not is_admin:
-        return
-    return await authdb.delete_one({"chat_id": chat_id})
+    return await settings_cache.set("nonadmin", chat_id, False)
 
 
 # Video Limit
 async def is_video_allowed(chat_idd) -> str:
-    chat_id = 123456
-    if not vlimit:
-        dblimit = await videodb.find_one({"chat_id": chat_id})
-        if not dblimit:
-            vlimit.clear()
-            vlimit.append(config.VIDEO_STREAM_LIMIT)
-            limit = config.VIDEO_STREAM_LIMIT
-        else:
-            limit = dblimit["limit"]
-            vlimit.clear()
-            vlimit.append(limit)
-    else:
-        limit = vlimit[0]
+    limit = await get_video_limit()
     if limit == 0:
         return False
-    count = len(await get_active_video_chats())
+    count = len(active_sessions.video)
     if int(count) == int(limit):
         if not await is_active_video_chat(chat_idd):
             return False
@@ -502,131 +603,72 @@ async def is_video_allowed(chat_idd) -> str:
 
 
 async def get_video_limit() -> str:
-    chat_id = 123456
-    if not vlimit:
-        dblimit = await videodb.find_one({"chat_id": chat_id})
-        if not dblimit:
-            limit = config.VIDEO_STREAM_LIMIT
-        else:
-            limit = dblimit["limit"]
-    else:
-        limit = vlimit[0]
-    return limit
+    return await settings_cache.get("videolimit", 123456)
 
 
 async def set_video_limit(limt: int):
-    chat_id = 123456
-    vlimit.clear()
-    vlimit.append(limt)
-    return await videodb.update_one(
-        {"chat_id": chat_id}, {"$set": {"limit": limt}}, upsert=True
-    )
+    return await settings_cache.set("videolimit", 123456, limt)
 
 
 # On Off
 async def is_on_off(on_off: int) -> bool:
-    onoff = await onoffdb.find_one({"on_off": on_off})
-    if not onoff:
-        return False
-    return True
+    return await settings_cache.get("onoff", on_off)
 
 
 async def add_on(on_off: int):
-    is_on = await is_on_off(on_off)
-    if is_on:
+    if await is_on_off(on_off):
         return
-    return await onoffdb.insert_one({"on_off": on_off})
+    return await settings_cache.set("onoff", on_off, True)
 
 
 async def add_off(on_off: int):
-    is_off = await is_on_off(on_off)
-    if not is_off:
+    if not await is_on_off(on_off):
         return
-    return await onoffdb.delete_one({"on_off": on_off})
+    return await settings_cache.set("onoff", on_off, False)
 
 
 # Maintenance
 
 
 async def is_maintenance():
-    if not maintenance:
-        get = await onoffdb.find_one({"on_off": 1})
-        if not get:
-            maintenance.clear()
-            maintenance.append(2)
-            return True
-        else:
-            maintenance.clear()
-            maintenance.append(1)
-            return False
-    else:
-        if 1 in maintenance:
-            return False
-        else:
-            return True
+    return not await is_on_off(1)
 
 
 async def maintenance_off():
-    maintenance.clear()
-    maintenance.append(2)
-    is_off = await is_on_off(1)
-    if not is_off:
-        return
-    return await onoffdb.delete_one({"on_off": 1})
+    return await add_off(1)
 
 
 async def maintenance_on():
-    maintenance.clear()
-    maintenance.append(1)
-    is_on = await is_on_off(1)
-    if is_on:
-        return
-    return await onoffdb.insert_one({"on_off": 1})
+    return await add_on(1)
 
 
 # Audio Video Limit
 from pytgcalls.types import AudioQuality, VideoQuality
 
-AUDIO_FILE = os.path.join(config.TEMP_DB_FOLDER, "audio.json")
-VIDEO_FILE = os.path.join(config.TEMP_DB_FOLDER, "video.json")
-
-
-def load_data(file_path):
-    if os.path.exists(file_path):
-        with open(file_path, "r") as file:
-            return json.load(file)
-    return {}
-
-
-def save_data(file_path, data):
-    with open(file_path, "w") as file:
-        json.dump(data, file, indent=4)
-
-
-audio = load_data(AUDIO_FILE)
-video = load_data(VIDEO_FILE)
+audio = JsonFile(os.path.join(config.TEMP_DB_FOLDER, "audio.json"))
+video = JsonFile(os.path.join(config.TEMP_DB_FOLDER, "video.json"))
 
 
 async def save_audio_bitrate(chat_id: int, bitrate: str):
-    audio[str(chat_id)] = bitrate
-    save_data(AUDIO_FILE, audio)
+    audio.data[str(chat_id)] = bitrate
+    audio.save()
 
 
 async def save_video_bitrate(chat_id: int, bitrate: str):
-    video[str(chat_id)] = bitrate
-    save_data(VIDEO_FILE, video)
+    video.data[str(chat_id)] = bitrate
+    video.save()
 
 
 async def get_aud_bit_name(chat_id: int) -> str:
-    return audio.get(str(chat_id), "HIGH")
+    return audio.data.get(str(chat_id), "HIGH")
 
 
 async def get_vid_bit_name(chat_id: int) -> str:
-    return video.get(str(chat_id), "HD_720p")
+    return video.data.get(str(chat_id), "HD_720p")
 
 
 async def get_audio_bitrate(chat_id: int) -> str:
-    mode = audio.get(str(chat_id), "MEDIUM")
+    mode = audio.data.get(str(chat_id), "MEDIUM")
     return {
         "STUDIO": AudioQuality.STUDIO,
         "HIGH": AudioQuality.HIGH,
@@ -636,9 +678,8 @@ async def get_audio_bitrate(chat_id: int) -> str:
 
 
 async def get_video_bitrate(chat_id: int) -> str:
-    mode = video.get(
-        str(chat_id), "SD_480p"
-    )  # Ensure chat_id is a string for JSON compatibility
+    # Ensure chat_id is a string for JSON compatibility
+    mode = video.data.get(str(chat_id), "SD_480p")
     return {
         "UHD_4K": VideoQuality.UHD_4K,
         "QHD_2K": VideoQuality.QHD_2K,
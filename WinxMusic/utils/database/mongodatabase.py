@@ -1,10 +1,15 @@
 from typing import Dict, List, Union
 
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
 from WinxMusic.core.mongo import mongodb
 
 queriesdb = mongodb.queries
 userdb = mongodb.userstats
 chattopdb = mongodb.chatstats
+trackstatsdb = mongodb.trackstats
+statstotalsdb = mongodb.statstotals
 authuserdb = mongodb.authuser
 gbansdb = mongodb.gban
 sudoersdb = mongodb.sudoers
@@ -16,6 +21,82 @@ blockeddb = mongodb.blockedusers
 privatedb = mongodb.privatechats
 
 playlist = []
+authusers = {}
+
+
+class Registry:
+    def __init__(self, collection, key: str, max_size: int = 100000):
+        """
+        A set of ids stored as one ``{key: id}`` document each in ``collection``,
+        which has a unique index on ``key``.
+
+        Ids are added with a single upsert and remembered in memory, so adding an id
+        again, or asking for one that was added or found before, costs no round-trip.
+        The memory is dropped when it grows past ``max_size`` ids.
+        """
+        self.collection = collection
+        self.key = key
+        self.max_size = max_size
+        self.known = set()
+        self.hits = 0
+        self.writes = 0
+
+    def _remember(self, id_: int):
+        if len(self.known) >= self.max_size:
+            self.known.clear()
+        self.known.add(id_)
+
+    async def contains(self, id_: int) -> bool:
+        if id_ in self.known:
+            self.hits += 1
+            return True
+        if await self.collection.find_one({self.key: id_}, {"_id": 1}):
+            self._remember(id_)
+            return True
+        return False
+
+    async def add(self, id_: int) -> bool:
+        """Returns True when ``id_`` was not registered before."""
+        if id_ in self.known:
+            self.hits += 1
+            return False
+        self.writes += 1
+        try:
+            result = await self.collection.update_one(
+                {self.key: id_}, {"$setOnInsert": {self.key: id_}}, upsert=True
+            )
+            added = result.upserted_id is not None
+        except DuplicateKeyError:
+            # Registered by a concurrent upsert
+            added = False
+        self._remember(id_)
+        return added
+
+    async def remove(self, id_: int) -> bool:
+        """Returns True when ``id_`` was registered."""
+        self.known.discard(id_)
+        self.writes += 1
+        result = await self.collection.delete_one({self.key: id_})
+        return result.deleted_count > 0
+
+    def get_stats(self) -> dict:
+        return {"known": len(self.known), "hits": self.hits, "writes": self.writes}
+
+
+served_users = Registry(usersdb, "user_id")
+served_chats = Registry(chatsdb, "chat_id")
+private_chats = Registry(privatedb, "chat_id")
+blacklisted = Registry(blacklist_chatdb, "chat_id")
+gbanned = Registry(gbansdb, "user_id")
+blocked = Registry(blockeddb, "user_id")
+registries = {
+    "users": served_users,
+    "chats": served_chats,
+    "private": private_chats,
+    "blacklist": blacklisted,
+    "gban": gbanned,
+    "blocked": blocked,
+}
 
 
 # Playlist
@@ -71,10 +152,7 @@ async def delete_playlist(chat_id: int, name: str) -> bool:
 
 
 async def is_served_user(user_id: int) -> bool:
-    user = await usersdb.find_one({"user_id": user_id})
-    if not user:
-        return False
-    return True
+    return await served_users.contains(user_id)
 
 
 async def get_served_users() -> list:
@@ -84,16 +162,27 @@ async def get_served_users() -> list:
     return users_list
 
 
+async def _iter_ids(collection, key: str, query: dict, batch_size: int):
+    cursor = collection.find(query, {"_id": 0, key: 1}).batch_size(batch_size)
+    async for document in cursor:
+        yield int(document[key])
+
+
+def iter_served_users(batch_size: int = 500):
+    """Yields the served user ids, reading ``batch_size`` of them at a time."""
+    return _iter_ids(usersdb, "user_id", {"user_id": {"$gt": 0}}, batch_size)
+
+
+async def count_served_users() -> int:
+    return await usersdb.count_documents({"user_id": {"$gt": 0}})
+
+
 async def add_served_user(user_id: int):
-    is_served = await is_served_user(user_id)
-    if is_served:
-        return
-    return await usersdb.insert_one({"user_id": user_id})
+    return await served_users.add(user_id)
 
 
 async def delete_served_user(user_id: int):
-    if not await is_served_user(user_id):
-        await usersdb.delete_one({"user_id": user_id})
+    return await served_users.remove(user_id)
 
 
 # Served Chats
@@ -106,22 +195,25 @@ async def get_served_chats() -> list:
     return chats_list
 
 
+def iter_served_chats(batch_size: int = 500):
+    """Yields the served chat ids, reading ``batch_size`` of them at a time."""
+    return _iter_ids(chatsdb, "chat_id", {"chat_id": {"$lt": 0}}, batch_size)
+
+
+async def count_served_chats() -> int:
+    return await chatsdb.count_documents({"chat_id": {"$lt": 0}})
+
+
 async def is_served_chat(chat_id: int) -> bool:
-    chat = await chatsdb.find_one({"chat_id": chat_id})
-    if not chat:
-        return False
-    return True
+    return await served_chats.contains(chat_id)
 
 
 async def add_served_chat(chat_id: int):
-    is_served = await is_served_chat(chat_id)
-    if is_served:
-        return
-    return await chatsdb.insert_one({"chat_id": chat_id})
+    return await served_chats.add(chat_id)
 
 
 async def delete_served_chat(chat_id: int):
-    await chatsdb.delete_one({"chat_id": chat_id})
+    await served_chats.remove(chat_id)
 
 
 # Blacklisted Chats
@@ -135,17 +227,11 @@ async def blacklisted_chats() -> list:
 
 
 async def blacklist_chat(chat_id: int) -> bool:
-    if not await blacklist_chatdb.find_one({"chat_id": chat_id}):
-        await blacklist_chatdb.insert_one({"chat_id": chat_id})
-        return True
-    return False
+    return await blacklisted.add(chat_id)
 
 
 async def whitelist_chat(chat_id: int) -> bool:
-    if await blacklist_chatdb.find_one({"chat_id": chat_id}):
-        await blacklist_chatdb.delete_one({"chat_id": chat_id})
-        return True
-    return False
+    return await blacklisted.remove(chat_id)
 
 
 # Private Served Chats
@@ -159,34 +245,38 @@ async def get_private_served_chats() -> list:
 
 
 async def is_served_private_chat(chat_id: int) -> bool:
-    chat = await privatedb.find_one({"chat_id": chat_id})
-    if not chat:
-        return False
-    return True
+    return await private_chats.contains(chat_id)
 
 
 async def add_private_chat(chat_id: int):
-    is_served = await is_served_private_chat(chat_id)
-    if is_served:
-        return
-    return await privatedb.insert_one({"chat_id": chat_id})
+    return await private_chats.add(chat_id)
 
 
 async def remove_private_chat(chat_id: int):
-    is_served = await is_served_private_chat(chat_id)
-    if not is_served:
-        return
-    return await privatedb.delete_one({"chat_id": chat_id})
+    return await private_chats.remove(chat_id)
 
 
 # Auth Users DB
 
 
 async def _get_authusers(chat_id: int) -> Dict[str, int]:
+    if chat_id in authusers:
+        return authusers[chat_id]
     _notes = await authuserdb.find_one({"chat_id": chat_id})
-    if not _notes:
-        return {}
-    return _notes["notes"]
+    authusers[chat_id] = _notes["notes"] if _notes else {}
+    return authusers[chat_id]
+
+
+async def set_authusers(chat_id: int, notes: dict):
+    authusers[chat_id] = notes
+    await authuserdb.update_one(
+        {"chat_id": chat_id}, {"$set": {"notes": notes}}, upsert=True
+    )
+
+
+async def preload_authusers():
+    async for _notes in authuserdb.find({}, {"_id": 0, "chat_id": 1, "notes": 1}):
+        authusers.setdefault(_notes["chat_id"], _notes.get("notes") or {})
 
 
 async def get_authuser_names(chat_id: int) -> List[str]:
@@ -209,10 +299,7 @@ async def save_authuser(chat_id: int, name: str, note: dict):
     name = name
     _notes = await _get_authusers(chat_id)
     _notes[name] = note
-
-    await authuserdb.update_one(
-        {"chat_id": chat_id}, {"$set": {"notes": _notes}}, upsert=True
-    )
+    await set_authusers(chat_id, _notes)
 
 
 async def delete_authuser(chat_id: int, name: str) -> bool:
@@ -220,11 +307,7 @@ async def delete_authuser(chat_id: int, name: str) -> bool:
     name = name
     if name in notesd:
         del notesd[name]
-        await authuserdb.update_one(
-            {"chat_id": chat_id},
-            {"$set": {"notes": notesd}},
-            upsert=True,
-        )
+        await set_authusers(chat_id, notesd)
         return True
     return False
 
@@ -241,24 +324,15 @@ async def get_gbanned() -> list:
 
 
 async def is_gbanned_user(user_id: int) -> bool:
-    user = await gbansdb.find_one({"user_id": user_id})
-    if not user:
-        return False
-    return True
+    return await gbanned.contains(user_id)
 
 
 async def add_gban_user(user_id: int):
-    is_gbanned = await is_gbanned_user(user_id)
-    if is_gbanned:
-        return
-    return await gbansdb.insert_one({"user_id": user_id})
+    return await gbanned.add(user_id)
 
 
 async def remove_gban_user(user_id: int):
-    is_gbanned = await is_gbanned_user(user_id)
-    if not is_gbanned:
-        return
-    return await gbansdb.delete_one({"user_id": user_id})
+    return await gbanned.remove(user_id)
 
 
 # Sudoers
@@ -310,99 +384,174 @@ async def set_queries(mode: int):
     )
 
 
-# Top Chats DB
+# Top Tracks DB
+#
+# One document per (scope, owner, track) in ``trackstats`` where scope is "chat",
+# "user" or "global" (owner 0), and one document per (scope, owner) in
+# ``statstotals`` holding the total plays and the number of distinct tracks.
 
 
-async def get_top_chats() -> dict:
+async def _get_tracks(scope: str, owner: int, limit: int = None) -> dict:
     results = {}
-    async for chat in chattopdb.find({"chat_id": {"$lt": 0}}):
-        chat_id = chat["chat_id"]
-        total = 0
-        for i in chat["vidid"]:
-            counts_ = chat["vidid"][i]["spot"]
-            if counts_ > 0:
-                total += counts_
-                results[chat_id] = total
+    cursor = trackstatsdb.find(
+        {"scope": scope, "owner": owner, "spot": {"$gt": 0}},
+        {"_id": 0, "vidid": 1, "spot": 1, "title": 1},
+    ).sort("spot", -1)
+    if limit:
+        cursor = cursor.limit(limit)
+    async for track in cursor:
+        results[track["vidid"]] = {"spot": track["spot"], "title": track["title"]}
     return results
 
 
-async def get_global_tops() -> dict:
+async def _get_totals(scope: str, limit: int = 10) -> dict:
     results = {}
-    async for chat in chattopdb.find({"chat_id": {"$lt": 0}}):
-        for i in chat["vidid"]:
-            counts_ = chat["vidid"][i]["spot"]
-            title_ = chat["vidid"][i]["title"]
-            if counts_ > 0:
-                if i not in results:
-                    results[i] = {}
-                    results[i]["spot"] = counts_
-                    results[i]["title"] = title_
-                else:
-                    spot = results[i]["spot"]
-                    count_ = spot + counts_
-                    results[i]["spot"] = count_
+    cursor = (
+        statstotalsdb.find({"scope": scope, "spot": {"$gt": 0}}, {"_id": 0})
+        .sort("spot", -1)
+        .limit(limit)
+    )
+    async for total in cursor:
+        results[total["owner"]] = total["spot"]
     return results
 
 
-async def get_particulars(chat_id: int) -> Dict[str, int]:
-    ids = await chattopdb.find_one({"chat_id": chat_id})
-    if not ids:
-        return {}
-    return ids["vidid"]
+async def get_stats_totals(scope: str, owner: int = 0) -> dict:
+    total = await statstotalsdb.find_one({"scope": scope, "owner": owner})
+    if not total:
+        return {"spot": 0, "tracks": 0}
+    return {"spot": total.get("spot", 0), "tracks": total.get("tracks", 0)}
 
 
-async def get_particular_top(chat_id: int, name: str) -> Union[bool, dict]:
-    ids = await get_particulars(chat_id)
-    if name in ids:
-        return ids[name]
+async def get_top_chats(limit: int = 10) -> dict:
+    return await _get_totals("chat", limit)
+
+
+async def get_global_tops(limit: int = 10) -> dict:
+    return await _get_tracks("global", 0, limit)
 
 
-async def update_particular_top(chat_id: int, name: str, vidid: dict):
-    ids = await get_particulars(chat_id)
-    ids[name] = vidid
-    await chattopdb.update_one(
-        {"chat_id": chat_id}, {"$set": {"vidid": ids}}, upsert=True
+async def get_particulars(chat_id: int, limit: int = None) -> Dict[str, int]:
+    return await _get_tracks("chat", chat_id, limit)
+
+
+async def get_particular_top(chat_id: int, name: str) -> Union[bool, dict]:
+    track = await trackstatsdb.find_one(
+        {"scope": "chat", "owner": chat_id, "vidid": name}
     )
+    if track:
+        return {"spot": track["spot"], "title": track["title"]}
 
 
 # Top User DB
 
 
-async def get_userss(chat_id: int) -> Dict[str, int]:
-    ids = await userdb.find_one({"chat_id": chat_id})
-    if not ids:
-        return {}
-    return ids["vidid"]
+async def get_userss(chat_id: int, limit: int = None) -> Dict[str, int]:
+    return await _get_tracks("user", chat_id, limit)
 
 
 async def delete_userss(chat_id: int) -> bool:
-    result = await userdb.delete_one({"chat_id": chat_id})
+    result = await trackstatsdb.delete_many({"scope": "user", "owner": chat_id})
+    await statstotalsdb.delete_one({"scope": "user", "owner": chat_id})
     return result.deleted_count > 0
 
 
 async def get_user_top(chat_id: int, name: str) -> Union[bool, dict]:
-    ids = await get_userss(chat_id)
-    if name in ids:
-        return ids[name]
-
-
-async def update_user_top(chat_id: int, name: str, vidid: dict):
-    ids = await get_userss(chat_id)
-    ids[name] = vidid
-    await userdb.update_one({"chat_id": chat_id}, {"$set": {"vidid": ids}}, upsert=True)
+    track = await trackstatsdb.find_one(
+        {"scope": "user", "owner": chat_id, "vidid": name}
+    )
+    if track:
+        return {"spot": track["spot"], "title": track["title"]}
+
+
+async def get_topp_users(limit: int = 10) -> dict:
+    return await _get_totals("user", limit)
+
+
+async def _migrate_tracks(scope: str, owner: int, tracks: dict):
+    """
+    Adds the legacy ``{vidid: [spot, title]}`` counts of one owner to
+    ``trackstats``. Each track document is marked once its count is added, so
+    running this again after a failure adds nothing twice and keeps the plays
+    recorded since.
+    """
+    keys = [{"scope": scope, "owner": owner, "vidid": vidid} for vidid in tracks]
+    await trackstatsdb.bulk_write(
+        [
+            UpdateOne(key, {"$setOnInsert": {"spot": 0, "title": title}}, upsert=True)
+            for key, (_, title) in zip(keys, tracks.values())
+        ],
+        ordered=False,
+    )
+    await trackstatsdb.bulk_write(
+        [
+            UpdateOne(
+                {**key, "migrated": {"$ne": True}},
+                {"$inc": {"spot": spot}, "$set": {"migrated": True}},
+            )
+            for key, (spot, _) in zip(keys, tracks.values())
+        ],
+        ordered=False,
+    )
 
 
-async def get_topp_users() -> dict:
-    results = {}
-    async for chat in userdb.find({"chat_id": {"$gt": 0}}):
-        user_id = chat["chat_id"]
-        total = 0
-        for i in chat["vidid"]:
-            counts_ = chat["vidid"][i]["spot"]
-            if counts_ > 0:
-                total += counts_
-        results[user_id] = total
-    return results
+async def _recount_totals(scope: str):
+    """Rebuilds the ``statstotals`` of ``scope`` from its ``trackstats``."""
+    pipeline = [
+        {"$match": {"scope": scope}},
+        {
+            "$group": {
+                "_id": "$owner",
+                "spot": {"$sum": "$spot"},
+                "tracks": {"$sum": 1},
+            }
+        },
+    ]
+    operations = [
+        UpdateOne(
+            {"scope": scope, "owner": total["_id"]},
+            {"$set": {"spot": total["spot"], "tracks": total["tracks"]}},
+            upsert=True,
+        )
+        async for total in trackstatsdb.aggregate(pipeline, allowDiskUse=True)
+    ]
+    if operations:
+        await statstotalsdb.bulk_write(operations, ordered=False)
+
+
+async def migrate_top_stats():
+    """
+    Moves the old per-chat and per-user documents, which embedded every track in
+    a ``vidid`` map, to ``trackstats``. Migrated collections are renamed with a
+    ``_legacy`` suffix.
+
+    Safe to run again after a partial failure: counts are added at most once per
+    track and the totals are recounted from ``trackstats``. It runs before the
+    bot records any play, so the recount races with no writes.
+    """
+    global_tracks = {}
+    for scope, legacy in (("chat", chattopdb), ("user", userdb)):
+        if not await legacy.estimated_document_count():
+            continue
+        async for doc in legacy.find({}):
+            tracks = {
+                vidid: [track.get("spot", 0), track.get("title")]
+                for vidid, track in (doc.get("vidid") or {}).items()
+            }
+            if not tracks:
+                continue
+            await _migrate_tracks(scope, doc["chat_id"], tracks)
+            if scope == "chat":
+                for vidid, (spot, title) in tracks.items():
+                    if vidid not in global_tracks:
+                        global_tracks[vidid] = [0, title]
+                    global_tracks[vidid][0] += spot
+        await _recount_totals(scope)
+        if scope == "chat" and global_tracks:
+            # Built from every legacy chat document, migrated before or not
+            await _migrate_tracks("global", 0, global_tracks)
+            await _recount_totals("global")
+        await legacy.rename(f"{legacy.name}_legacy", dropTarget=True)
 
 
 # Gban Users
@@ -423,21 +572,12 @@ async def get_banned_count() -> int:
 
 
 async def is_banned_user(user_id: int) -> bool:
-    user = await blockeddb.find_one({"user_id": user_id})
-    if not user:
-        return False
-    return True
+    return await blocked.contains(user_id)
 
 
 async def add_banned_user(user_id: int):
-    is_gbanned = await is_banned_user(user_id)
-    if is_gbanned:
-        return
-    return await blockeddb.insert_one({"user_id": user_id})
+    return await blocked.add(user_id)
 
 
 async def remove_banned_user(user_id: int):
-    is_gbanned = await is_banned_user(user_id)
-    if not is_gbanned:
-        return
-    return await blockeddb.delete_one({"user_id": user_id})
+    return await blocked.remove(user_id)
@@ -0,0 +1,146 @@
+import asyncio
+import collections
+import time
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+import config
+from WinxMusic.core.mongo import mongodb
+from WinxMusic.logging import LOGGER
+from WinxMusic.utils.database.leaderboard import leaderboards
+
+trackstatsdb = mongodb.trackstats
+statstotalsdb = mongodb.statstotals
+
+
+class PlayStats:
+    def __init__(self, interval: int = 30):
+        """
+        Write-behind buffer for the top tracks.
+
+        Plays are counted in memory and written every ``interval`` seconds as one
+        unordered bulk of ``$inc`` updates, one per chat, user and global track,
+        followed by one bulk for the per-chat and per-user totals. Updates a flush
+        fails to write, and only those, are merged back into the buffers and
+        retried later.
+        """
+        self.interval = interval
+        self.tracks = {}  # (scope, owner) -> {vidid: [plays, title]}
+        self.totals = {}  # (scope, owner) -> [plays, new tracks]
+        self.flushes = 0
+        self.writes = 0
+
+    def _add(self, key: tuple, vidid: str, title: str, plays: int = 1):
+        tracks = self.tracks.setdefault(key, {})
+        if vidid in tracks:
+            tracks[vidid][0] += plays
+            tracks[vidid][1] = title
+        else:
+            tracks[vidid] = [plays, title]
+
+    def record(self, chat_id: int, user_id: int, vidid: str, title: str):
+        self._add(("chat", chat_id), vidid, title)
+        self._add(("user", user_id), vidid, title)
+        self._add(("global", 0), vidid, title)
+
+    def _add_total(self, key: tuple, plays: int, tracks: int):
+        total = self.totals.setdefault(key, [0, 0])
+        total[0] += plays
+        total[1] += tracks
+
+    async def flush(self):
+        # Swap the buffer first, plays recorded while writing go to the next flush
+        pending, self.tracks = self.tracks, {}
+        if pending:
+            self.flushes += 1
+            await self._flush_tracks(pending)
+        await self._flush_totals()
+
+    async def _flush_tracks(self, pending: dict):
+        entries = [
+            (key, vidid, plays, title)
+            for key, tracks in pending.items()
+            for vidid, (plays, title) in tracks.items()
+        ]
+        operations = [
+            UpdateOne(
+                {"scope": scope, "owner": owner, "vidid": vidid},
+                {"$inc": {"spot": plays}, "$set": {"title": title}},
+                upsert=True,
+            )
+            for (scope, owner), vidid, plays, title in entries
+        ]
+        failed = set()
+        started = time.time()
+        try:
+            result = await trackstatsdb.bulk_write(operations, ordered=False)
+            upserted = result.upserted_ids
+        except BulkWriteError as e:
+            # The bulk is unordered, every operation not listed here was applied
+            failed = {error["index"] for error in e.details["writeErrors"]}
+            upserted = {u["index"]: u["_id"] for u in e.details.get("upserted", [])}
+            LOGGER(__name__).warning(
+                f"Could not flush {len(failed)} of {len(operations)} play counts: {e}"
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not flush play counts: {e}")
+            for key, vidid, plays, title in entries:
+                self._add(key, vidid, title, plays)
+            return
+        written = {}
+        for i, (key, vidid, plays, title) in enumerate(entries):
+            if i in failed:
+                self._add(key, vidid, title, plays)
+            else:
+                written.setdefault(key, {})[vidid] = [plays, title]
+        self.writes += len(operations) - len(failed)
+        # Tracks played for the first time in a scope were upserted
+        new_tracks = collections.Counter(entries[i][0] for i in upserted)
+        for key, tracks in written.items():
+            self._add_total(
+                key, sum(plays for plays, _ in tracks.values()), new_tracks[key]
+            )
+        leaderboards.apply(written, new_tracks, started)
+
+    async def _flush_totals(self):
+        totals, self.totals = self.totals, {}
+        if not totals:
+            return
+        keys = list(totals)
+        operations = [
+            UpdateOne(
+                {"scope": scope, "owner": owner},
+                {"$inc": {"spot": plays, "tracks": tracks}},
+                upsert=True,
+            )
+            for (scope, owner), (plays, tracks) in totals.items()
+        ]
+        try:
+            await statstotalsdb.bulk_write(operations, ordered=False)
+            return
+        except BulkWriteError as e:
+            failed = [keys[error["index"]] for error in e.details["writeErrors"]]
+        except Exception:
+            failed = keys
+        LOGGER(__name__).warning(f"Could not flush {len(failed)} play totals")
+        for key in failed:
+            self._add_total(key, *totals[key])
+
+    async def run(self):
+        while not await asyncio.sleep(self.interval):
+            try:
+                await self.flush()
+            except Exception:
+                continue
+
+    def get_stats(self):
+        return {
+            "pending": sum(len(tracks) for tracks in self.tracks.values())
+            + len(self.totals),
+            "flushes": self.flushes,
+            "writes": self.writes,
+        }
+
+
+play_stats = PlayStats(interval=config.STATS_FLUSH_INTERVAL)
@@ -1,12 +1,112 @@
 import asyncio
+import importlib
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from functools import partial, wraps
 
+import config
+
+
+def _call_wrapped(module: str, qualname: str, args, kwargs):
+    # Process pools pickle functions by name, which resolves to the asyncify
+    # wrapper; the worker looks the wrapped function up instead.
+    func = importlib.import_module(module)
+    for name in qualname.split("."):
+        func = getattr(func, name)
+    return func.__wrapped__(*args, **kwargs)
+
+
+class Executor:
+    def __init__(self, name: str, workers: int, processes: bool = False):
+        """
+        A named pool for blocking calls, so a slow kind of work (downloads) can't
+        take every thread from a cheap one (file deletion, API calls).
+
+        With ``processes`` the calls run in forked worker processes; their
+        arguments and results must then be picklable.
+        """
+        self.name = name
+        self.workers = workers
+        self.processes = processes
+        self.executor = None
+        self.running = 0
+        self.peak = 0
+        self.jobs = 0
+        self.latency = 0.0
+
+    def _executor(self):
+        if self.executor is None:
+            if self.processes:
+                self.executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("fork")
+                )
+            else:
+                self.executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix=f"winx-{self.name}"
+                )
+        return self.executor
+
+    async def run(self, func, *args, **kwargs):
+        if self.processes:
+            call = partial(
+                _call_wrapped, func.__module__, func.__qualname__, args, kwargs
+            )
+        else:
+            call = partial(func, *args, **kwargs)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        started = time.monotonic()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor(), call
+            )
+        finally:
+            self.running -= 1
+            self.jobs += 1
+            self.latency += time.monotonic() - started
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def get_stats(self):
+        return {
+            "workers": self.workers,
+            "running": min(self.running, self.workers),
+            "queued": max(0, self.running - self.workers),
+            "peak": self.peak,
+            "jobs": self.jobs,
+            "avg_latency": self.latency / self.jobs if self.jobs else 0.0,
+        }
+
+
+executors = {
+    "io": Executor("io", config.IO_WORKERS),
+    "download": Executor("download", config.DOWNLOAD_WORKERS),
+    "cpu": Executor("cpu", config.CPU_WORKERS, processes=config.CPU_PROCESSES),
+}
+
+
+def asyncify(func=None, executor: str = "io"):
+    """
+    Runs a blocking function in one of the named ``executors``::
+
+        @asyncify
+        def cheap(): ...
+
+        @asyncify("download")
+        def slow(): ...
+    """
+    if isinstance(func, str):
+        func, executor = None, func
+    if func is None:
+        return partial(asyncify, executor=executor)
+    pool = executors[executor]
 
-def asyncify(func):
     @wraps(func)
     async def run(*args, **kwargs):
-        loop = asyncio.get_running_loop()
-        pfunc = partial(func, *args, **kwargs)
-        return await loop.run_in_executor(None, pfunc)
+        return await pool.run(func, *args, **kwargs)
 
     return run
@@ -2,7 +2,7 @@ from pyrogram.errors import ChannelPrivate
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from WinxMusic import Platform, app
-from WinxMusic.core.call import Winx
+from WinxMusic.core.call import Winx, call_participants
 from WinxMusic.misc import SUDOERS
 from WinxMusic.utils.database import (
     get_assistant,
@@ -124,14 +124,10 @@ def play_wrapper(command):
             userbot = await get_assistant(message.chat.id)
             # Getting all members id that in voicechat
             try:
-                call_participants_id = [
-                    member.chat.id
-                    async for member in userbot.get_call_members(chat_id)
-                    if member.chat
-                ]
+                members = await call_participants.get(chat_id)
                 # Checking if assistant id not in list so clear queues and remove active voice chat and process
 
-                if not call_participants_id or userbot.id not in call_participants_id:
+                if not members or userbot.id not in members:
                     await Winx.stop_stream(chat_id)
             except ChannelPrivate:
                 pass
@@ -1,29 +1,80 @@
+import collections
 import os
 
+from WinxMusic.utils.cache.downloads import download_store
 from WinxMusic.utils.decorators import asyncify
-from config import autoclean
+
+
+class FileRegistry:
+    def __init__(self):
+        """
+        Counts how many queued tracks point at each file.
+
+        ``acquire``/``release`` are O(1). Files whose last reference is released are
+        collected and unlinked together by ``flush``, off the event loop.
+        """
+        self.refs = collections.Counter()
+        self.pending = set()
+
+    def acquire(self, file: str):
+        self.refs[file] += 1
+        self.pending.discard(file)
+        download_store.acquire(file)
+
+    def release(self, file: str):
+        if file not in self.refs:
+            return
+        download_store.release(file)
+        if self.refs[file] > 1:
+            self.refs[file] -= 1
+            return
+        del self.refs[file]
+        if "vid_" in file or "live_" in file or "index_" in file:
+            return
+        if download_store.managed(file):
+            # Kept on disk for reuse, the download store evicts it when cold
+            return
+        self.pending.add(file)
+
+    def hold(self, track: dict, path: str):
+        """
+        Keeps ``path``, the file a ``vid_`` track was downloaded to, from being
+        evicted until the track leaves the queue.
+        """
+        download_store.acquire(path)
+        if track.get("path"):
+            download_store.release(track["path"])
+        track["path"] = path
+
+    async def flush(self):
+        if not self.pending:
+            return
+        files, self.pending = self.pending, set()
+        await _unlink(files)
 
 
 @asyncify
-def auto_clean(popped):
-    def _auto_clean(popped_item):
+def _unlink(files):
+    for file in files:
         try:
-            rem = popped_item["file"]
-            autoclean.remove(rem)
-            count = autoclean.count(rem)
-            if count == 0:
-                if "vid_" not in rem and "live_" not in rem and "index_" not in rem:
-                    try:
-                        os.remove(rem)
-                    except Exception:
-                        pass
+            os.remove(file)
         except Exception:
             pass
 
+
+file_registry = FileRegistry()
+
+
+async def auto_clean(popped):
     if isinstance(popped, dict):
-        _auto_clean(popped)
-    elif isinstance(popped, list):
-        for pop in popped:
-            _auto_clean(pop)
-    else:
+        popped = [popped]
+    elif not isinstance(popped, list):
         raise ValueError("Expected popped to be a dict or list.")
+    for pop in popped:
+        try:
+            file_registry.release(pop["file"])
+            if pop.get("path"):
+                download_store.release(pop.pop("path"))
+        except Exception:
+            pass
+    await file_registry.flush()
@@ -0,0 +1,60 @@
+import time
+
+
+class PlaybackClock:
+    def __init__(self):
+        """
+        Tracks how far the current track of each chat has played.
+
+        Nothing ticks in the background: the clock stores when playback started,
+        the position it started from and how long it has been paused, and works out
+        the played seconds from ``time.monotonic()`` whenever it is asked.
+        """
+        self.clocks = {}
+
+    def start(self, chat_id: int, position: int = 0):
+        """Marks the start of a new stream at ``position`` seconds."""
+        self.clocks[chat_id] = {
+            "started": time.monotonic(),
+            "offset": position,
+            "paused": 0.0,
+            "paused_at": None,
+        }
+
+    def pause(self, chat_id: int):
+        clock = self.clocks.get(chat_id)
+        if clock and clock["paused_at"] is None:
+            clock["paused_at"] = time.monotonic()
+
+    def resume(self, chat_id: int):
+        clock = self.clocks.get(chat_id)
+        if clock and clock["paused_at"] is not None:
+            clock["paused"] += time.monotonic() - clock["paused_at"]
+            clock["paused_at"] = None
+
+    def seek(self, chat_id: int, position: int):
+        """Restarts the clock at ``position``, keeping its paused state."""
+        paused = self.clocks.get(chat_id, {}).get("paused_at") is not None
+        self.start(chat_id, max(0, position))
+        if paused:
+            self.pause(chat_id)
+
+    def stop(self, chat_id: int):
+        self.clocks.pop(chat_id, None)
+
+    def played(self, chat_id: int, duration: int = 0) -> int:
+        """
+        Returns the played seconds of the current track, capped at ``duration``
+        when it is known.
+        """
+        clock = self.clocks.get(chat_id)
+        if not clock:
+            return 0
+        now = clock["paused_at"] or time.monotonic()
+        played = int(clock["offset"] + now - clock["started"] - clock["paused"])
+        if duration:
+            played = min(played, int(duration))
+        return max(0, played)
+
+
+playback_clock = PlaybackClock()
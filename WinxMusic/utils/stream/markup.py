@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+from pyrogram.errors import FloodWait, MessageNotModified
+from pyrogram.types import InlineKeyboardMarkup
+
+import config
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int = None):
+        """
+        Allows ``rate`` operations per second on average, with bursts of up to
+        ``capacity`` operations.
+        """
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class MarkupUpdater:
+    def __init__(self, rate: float, max_backoff: int = 300):
+        """
+        Edits the reply markup of "now playing" messages without flooding Telegram.
+
+        Every edit takes a token from a bucket shared by all chats, edits whose
+        button text did not change since the last one are skipped, and a chat that
+        hits a FloodWait is left alone for the requested time, doubled on every
+        further FloodWait up to ``max_backoff`` seconds.
+        """
+        self.bucket = TokenBucket(rate)
+        self.max_backoff = max_backoff
+        self.rendered = {}  # chat_id -> (message id, button text)
+        self.backoff = {}  # chat_id -> (retry at, strikes)
+        self.edits = 0
+        self.skipped = 0
+        self.flood_waits = 0
+
+    @staticmethod
+    def _text(buttons) -> tuple:
+        return tuple(button.text for row in buttons for button in row)
+
+    def forget(self, chat_id: int):
+        self.rendered.pop(chat_id, None)
+        self.backoff.pop(chat_id, None)
+
+    async def update(self, chat_id: int, message, buttons):
+        retry_at, strikes = self.backoff.get(chat_id, (0, 0))
+        if time.monotonic() < retry_at:
+            self.skipped += 1
+            return
+        rendered = (message.id, self._text(buttons))
+        if self.rendered.get(chat_id) == rendered:
+            self.skipped += 1
+            return
+        await self.bucket.acquire()
+        try:
+            await message.edit_reply_markup(reply_markup=InlineKeyboardMarkup(buttons))
+        except MessageNotModified:
+            pass
+        except FloodWait as e:
+            self.flood_waits += 1
+            delay = min(self.max_backoff, int(e.value) * 2**strikes)
+            self.backoff[chat_id] = (time.monotonic() + delay, strikes + 1)
+            return
+        except Exception:
+            return
+        self.edits += 1
+        self.rendered[chat_id] = rendered
+        self.backoff.pop(chat_id, None)
+
+    def get_stats(self):
+        return {
+            "edits": self.edits,
+            "skipped": self.skipped,
+            "flood_waits": self.flood_waits,
+            "backoff": len(self.backoff),
+        }
+
+
+markup_updater = MarkupUpdater(rate=config.MARKUP_EDIT_RATE)
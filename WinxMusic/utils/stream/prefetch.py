@@ -0,0 +1,105 @@
+import asyncio
+
+import config
+from WinxMusic import LOGGER, Platform
+from WinxMusic.misc import db
+from WinxMusic.utils.cache.downloads import download_store
+from WinxMusic.utils.stream.autoclear import file_registry
+
+
+class Prefetcher:
+    def __init__(self, concurrency: int = 2):
+        """
+        Downloads the next queued YouTube track while the current one plays.
+
+        Prefetching is skipped while the files held by queues already fill the
+        download store's budget, since the store could not make room for another.
+
+        :param concurrency: Maximum number of prefetch downloads running at once.
+        """
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.tasks = {}
+
+    def schedule(self, chat_id: int):
+        """Starts downloading ``db[chat_id][1]`` in the background, if needed."""
+        check = db.get(chat_id)
+        if not check or len(check) < 2:
+            return
+        track = check[1]
+        if "vid_" not in track["file"]:
+            return
+        key = (track["vidid"], str(track["streamtype"]) == "video")
+        if key in self.tasks:
+            return
+        self.tasks[key] = asyncio.create_task(self._download(*key))
+
+    async def _download(self, vidid: str, video: bool):
+        async with self.semaphore:
+            try:
+                limit = download_store.max_size
+                if limit and download_store.held_size() >= limit:
+                    return None
+                result = await Platform.youtube.download(
+                    vidid, None, videoid=True, video=video
+                )
+            except Exception as e:
+                LOGGER(__name__).warning(f"Prefetch of {vidid} failed: {e}")
+                return None
+        # Held until the track is played or leaves the queue
+        download_store.acquire(result[0])
+        return result
+
+    def ready(self, vidid: str, video) -> bool:
+        task = self.tasks.get((vidid, bool(video)))
+        if not task or not task.done() or task.cancelled():
+            return False
+        return task.result() is not None
+
+    async def fetch(self, track: dict, video):
+        """
+        Returns ``(file_path, direct)`` for the queued ``track``, reusing a
+        prefetched download when there is one and downloading it now otherwise. The
+        file is held for the track until it leaves the queue.
+        """
+        vidid = track["vidid"]
+        task = self.tasks.pop((vidid, bool(video)), None)
+        result = await task if task else None
+        if result:
+            file_registry.hold(track, result[0])
+            download_store.release(result[0])
+            return result
+        result = await Platform.youtube.download(
+            vidid, None, videoid=True, video=bool(video)
+        )
+        file_registry.hold(track, result[0])
+        return result
+
+    def update(self, chat_id: int):
+        """
+        Called after tracks of ``db[chat_id]`` were skipped, removed or reordered:
+        drops the prefetches no queue needs anymore, releasing their files, and
+        starts the one for the new next track.
+        """
+        self.prune()
+        self.schedule(chat_id)
+
+    def prune(self):
+        """Forgets prefetches that no longer match any queued track."""
+        queued = {
+            (track["vidid"], str(track["streamtype"]) == "video")
+            for tracks in db.values()
+            for track in tracks[:2]
+        }
+        for key in list(self.tasks):
+            if key not in queued:
+                self._drop(self.tasks.pop(key))
+
+    @staticmethod
+    def _drop(task):
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled() and task.result():
+            download_store.release(task.result()[0])
+
+
+prefetcher = Prefetcher(concurrency=config.PREFETCH_CONCURRENCY)
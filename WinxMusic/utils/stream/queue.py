@@ -1,7 +1,9 @@
 from typing import Union
 
 from WinxMusic.misc import db
-from config import autoclean, chatstats, userstats
+from WinxMusic.utils.database.playstats import play_stats
+from WinxMusic.utils.stream.autoclear import file_registry
+from WinxMusic.utils.stream.prefetch import prefetcher
 from config.config import time_to_seconds
 
 
@@ -32,7 +34,6 @@ async def put_queue(
         "file": file,
         "vidid": vidid,
         "seconds": duration_in_seconds,
-        "played": 0,
         "thumb": thumb,
     }
     if forceplay:
@@ -43,16 +44,11 @@ async def put_queue(
             db[chat_id].append(put)
     else:
         db[chat_id].append(put)
-    autoclean.append(file)
+    prefetcher.schedule(chat_id)
+    file_registry.acquire(file)
     vidid = "telegram" if vidid == "soundcloud" or vidid == "saavn" in vidid else vidid
 
-    to_append = {"vidid": vidid, "title": title}
-    if chat_id not in chatstats:
-        chatstats[chat_id] = []
-    chatstats[chat_id].append(to_append)
-    if user_id not in userstats:
-        userstats[user_id] = []
-    userstats[user_id].append(to_append)
+    play_stats.record(chat_id, user_id, vidid, title)
     return
 
 
@@ -76,7 +72,6 @@ async def put_queue_index(
         "file": file,
         "vidid": vidid,
         "seconds": 0,
-        "played": 0,
     }
     if forceplay:
         if check := db.get(chat_id):
@@ -1,4 +1,7 @@
+import asyncio
+import collections
 import os
+from contextlib import aclosing
 from random import randint
 
 from WinxMusic import Platform, app
@@ -21,6 +24,33 @@ from pyrogram.types import InlineKeyboardMarkup
 import config
 
 
+async def resolve_playlist(searches, videoid: bool | str = None):
+    """
+    Resolves playlist entries concurrently and yields their details in playlist
+    order as soon as each is ready. Only a window of PLAYLIST_FETCH_CONCURRENCY
+    entries is looked up ahead of the consumer; lookups still pending when it
+    stops are cancelled. Entries that fail to resolve yield None.
+    """
+
+    async def resolve(search):
+        try:
+            return await Platform.youtube.details(search, videoid)
+        except Exception:
+            return None
+
+    window = collections.deque()
+    try:
+        for search in searches:
+            window.append(asyncio.ensure_future(resolve(search)))
+            if len(window) >= config.PLAYLIST_FETCH_CONCURRENCY:
+                yield await window.popleft()
+        while window:
+            yield await window.popleft()
+    finally:
+        for task in window:
+            task.cancel()
+
+
 async def stream(
         _,
         mystic,
@@ -44,79 +74,84 @@ async def stream(
     if streamtype == "playlist":
         msg = f"{_['playlist_16']}\n\n"
         count = 0
-        for search in result:
-            if int(count) == config.PLAYLIST_FETCH_LIMIT:
-                continue
-            try:
+        tracks = resolve_playlist(result, False if spotify else True)
+        async with aclosing(tracks):
+            async for details in tracks:
+                if int(count) == config.PLAYLIST_FETCH_LIMIT:
+                    break
+                if not details:
+                    continue
                 (
                     title,
                     duration_min,
                     duration_sec,
                     thumbnail,
                     vidid,
-                ) = await Platform.youtube.details(search, False if spotify else True)
-            except Exception:
-                continue
-            if str(duration_min) == "None":
-                continue
-            if duration_sec > config.DURATION_LIMIT:
-                continue
-            if await is_active_chat(chat_id):
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                )
-                position = len(db.get(chat_id)) - 1
-                count += 1
-                msg += f"{count}- {title[:70]}\n"
-                msg += f"{_['playlist_17']} {position}\n\n"
-            else:
-                if not forceplay:
-                    db[chat_id] = []
-                status = True if video else None
-                try:
-                    file_path, direct = await Platform.youtube.download(
-                        vidid, mystic, video=status, videoid=True
+                ) = details
+                if str(duration_min) == "None":
+                    continue
+                if duration_sec > config.DURATION_LIMIT:
+                    continue
+                if await is_active_chat(chat_id):
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        f"vid_{vidid}",
+                        title,
+                        duration_min,
+                        user_name,
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
                     )
-                except Exception:
-                    raise AssistantErr(_["play_16"])
-                await Winx.join_call(
-                    chat_id, original_chat_id, file_path, video=status, image=thumbnail
-                )
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    file_path if direct else f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                    forceplay=forceplay,
-                )
-                img = await gen_thumb(vidid)
-                button = stream_markup(_, vidid, chat_id)
-                run = await app.send_photo(
-                    original_chat_id,
-                    photo=img,
-                    caption=_["stream_1"].format(
-                        title[:27],
-                        f"https://t.me/{app.username}?start=info_{vidid}",
+                    position = len(db.get(chat_id)) - 1
+                    count += 1
+                    msg += f"{count}- {title[:70]}\n"
+                    msg += f"{_['playlist_17']} {position}\n\n"
+                else:
+                    if not forceplay:
+                        db[chat_id] = []
+                    status = True if video else None
+                    try:
+                        file_path, direct = await Platform.youtube.download(
+                            vidid, mystic, video=status, videoid=True
+                        )
+                    except Exception:
+                        raise AssistantErr(_["play_16"])
+                    await Winx.join_call(
+                        chat_id,
+                        original_chat_id,
+                        file_path,
+                        video=status,
+                        image=thumbnail,
+                    )
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        file_path if direct else f"vid_{vidid}",
+                        title,
                         duration_min,
                         user_name,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
+                        forceplay=forceplay,
+                    )
+                    img = await gen_thumb(vidid)
+                    button = stream_markup(_, vidid, chat_id)
+                    run = await app.send_photo(
+                        original_chat_id,
+                        photo=img,
+                        caption=_["stream_1"].format(
+                            title[:27],
+                            f"https://t.me/{app.username}?start=info_{vidid}",
+                            duration_min,
+                            user_name,
+                        ),
+                        reply_markup=InlineKeyboardMarkup(button),
+                    )
+                    db[chat_id][0]["mystic"] = run
+                    db[chat_id][0]["markup"] = "stream"
         if count == 0:
             return
         else:
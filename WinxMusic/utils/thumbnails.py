@@ -1,16 +1,12 @@
-from py_yt import VideosSearch
+from WinxMusic import Platform
 
 
 async def gen_thumb(videoid, thumb=None):
     if thumb:
         return thumb
     try:
-        query = f"https://www.youtube.com/watch?v={videoid}"
-        results = VideosSearch(query, limit=1)
-        for result in (await results.next())["result"]:
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        return thumbnail
-    except Exception as e:
+        return await Platform.youtube.thumbnail(videoid, True)
+    except Exception:
         return f"https://img.youtube.com/vi/{videoid}/maxresdefault.jpg"
 
 
@@ -18,10 +14,6 @@ async def gen_qthumb(vidid, thumb=None):
     if thumb:
         return thumb
     try:
-        query = f"https://www.youtube.com/watch?v={vidid}"
-        results = VideosSearch(query, limit=1)
-        for result in (await results.next())["result"]:
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        return thumbnail
-    except Exception as e:
+        return await Platform.youtube.thumbnail(vidid, True)
+    except Exception:
         return f"https://img.youtube.com/vi/{vidid}/maxresdefault.jpg"
@@ -1,6 +1,6 @@
 import re
 import sys
-from os import getenv
+from os import cpu_count, getenv
 
 from dotenv import load_dotenv
 from pyrogram import filters
@@ -122,6 +122,75 @@ SERVER_PLAYLIST_LIMIT = int(getenv("SERVER_PLAYLIST_LIMIT", "25"))
 # MaximuM limit for fetching playlist's track from youtube, spotify, apple links.
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", "25"))
 
+# Number of playlist tracks looked up at the same time while queueing a playlist.
+PLAYLIST_FETCH_CONCURRENCY = int(getenv("PLAYLIST_FETCH_CONCURRENCY", "5"))
+
+# Maximum size (in MB) of downloaded tracks kept in downloads/ for reuse. Least recently played go first.
+DOWNLOAD_CACHE_LIMIT = int(getenv("DOWNLOAD_CACHE_LIMIT", "4096"))
+
+# Number of upcoming queued tracks downloaded at the same time while the current one plays.
+# Prefetching pauses while queued tracks already fill DOWNLOAD_CACHE_LIMIT.
+PREFETCH_CONCURRENCY = int(getenv("PREFETCH_CONCURRENCY", "2"))
+
+# Maximum number of YouTube metadata lookups kept in memory and their lifetime (in seconds)
+YT_CACHE_SIZE = int(getenv("YT_CACHE_SIZE", "2000"))
+YT_CACHE_TTL = int(getenv("YT_CACHE_TTL", "21600"))
+
+# Keep YouTube metadata in MongoDB too, so lookups survive restarts. Lifetime in seconds.
+YT_CACHE_PERSIST = getenv("YT_CACHE_PERSIST", "True").lower() == "true"
+YT_CACHE_PERSIST_TTL = int(getenv("YT_CACHE_PERSIST_TTL", "604800"))
+
+# Player timer buttons: every playing chat is refreshed once per window (in seconds) and
+# at most MARKUP_EDIT_RATE edits per second are sent across all chats.
+MARKUP_UPDATE_WINDOW = int(getenv("MARKUP_UPDATE_WINDOW", "6"))
+MARKUP_EDIT_RATE = float(getenv("MARKUP_EDIT_RATE", "10"))
+
+# Voice chat participants are tracked from call updates and fetched again after this many seconds
+PARTICIPANTS_SYNC_INTERVAL = int(getenv("PARTICIPANTS_SYNC_INTERVAL", "60"))
+
+# Play counts for the top tracks are buffered in memory and written to MongoDB every this many seconds
+STATS_FLUSH_INTERVAL = int(getenv("STATS_FLUSH_INTERVAL", "30"))
+
+# Top tracks, chats and users lists older than this many seconds are reloaded in the background
+LEADERBOARD_TTL = int(getenv("LEADERBOARD_TTL", "300"))
+
+# Direct stream urls are shared while at least half of their life is left (STREAM_URL_TTL seconds
+# when they have no expiry of their own) and resolved again in the background up to
+# STREAM_URL_REFRESH seconds before that
+STREAM_URL_TTL = int(getenv("STREAM_URL_TTL", "600"))
+STREAM_URL_REFRESH = int(getenv("STREAM_URL_REFRESH", "600"))
+
+# MongoDB connection pool: maximum and minimum connections, timeout (in milliseconds) for connecting,
+# picking a server and waiting for a free connection, read preference and wire compressors
+MONGO_POOL_SIZE = int(getenv("MONGO_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(getenv("MONGO_MIN_POOL_SIZE", "5"))
+MONGO_TIMEOUT = int(getenv("MONGO_TIMEOUT", "10000"))
+MONGO_READ_PREFERENCE = getenv("MONGO_READ_PREFERENCE", "primaryPreferred")
+MONGO_COMPRESSORS = getenv("MONGO_COMPRESSORS", "zlib")
+
+# MongoDB queries slower than this many milliseconds are logged
+MONGO_SLOW_QUERY = int(getenv("MONGO_SLOW_QUERY", "200"))
+
+# yt-dlp runs in long-lived worker processes: number of workers and seconds a lookup may take once
+# a worker picked it up, then the same for downloads, which get their own workers. Every audio play,
+# prefetch and /song download needs a download worker, so size it for the chats playing at once.
+YTDLP_WORKERS = int(getenv("YTDLP_WORKERS", "3"))
+YTDLP_TIMEOUT = int(getenv("YTDLP_TIMEOUT", "60"))
+YTDLP_DOWNLOAD_WORKERS = int(getenv("YTDLP_DOWNLOAD_WORKERS", "8"))
+YTDLP_DOWNLOAD_TIMEOUT = int(getenv("YTDLP_DOWNLOAD_TIMEOUT", "900"))
+
+# A cookie file refused by YouTube is not used for this many seconds, doubled on every further
+# refusal up to COOKIE_MAX_QUARANTINE
+COOKIE_QUARANTINE = int(getenv("COOKIE_QUARANTINE", "60"))
+COOKIE_MAX_QUARANTINE = int(getenv("COOKIE_MAX_QUARANTINE", "3600"))
+
+# Threads for blocking file and API calls, for downloads and for CPU heavy work (image resizing).
+# Set CPU_PROCESSES to True to run the CPU heavy work in processes instead of threads.
+IO_WORKERS = int(getenv("IO_WORKERS", "16"))
+DOWNLOAD_WORKERS = int(getenv("DOWNLOAD_WORKERS", "4"))
+CPU_WORKERS = int(getenv("CPU_WORKERS", str(cpu_count() or 2)))
+CPU_PROCESSES = getenv("CPU_PROCESSES", "False").lower() == "true"
+
 # Telegram audio  and video file size limit
 
 TG_AUDIO_FILESIZE_LIMIT = int(
@@ -163,12 +232,8 @@ PREFIXES = ["/", "!", "%", ",", ".", "@", "#"]
 
 adminlist = {}
 lyrical = {}
-chatstats = {}
-userstats = {}
 clean = {}
 
-autoclean = []
-
 # Images
 
 START_IMG_URL = getenv(
@@ -0,0 +1,67 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+types = pytest.importorskip("pytgcalls.types")
+
+# Loaded from its file so the test doesn't start the bot through WinxMusic/__init__.py
+_spec = importlib.util.spec_from_file_location(
+    "participants",
+    Path(__file__).resolve().parent.parent / "WinxMusic" / "core" / "participants.py",
+)
+participants = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(participants)
+
+
+def _update(chat_id, user_id, muted_by_admin=False, joined=False, left=False):
+    participant = types.GroupCallParticipant(
+        user_id=user_id,
+        muted=muted_by_admin,
+        muted_by_admin=muted_by_admin,
+        video=False,
+        screen_sharing=False,
+        video_camera=False,
+        raised_hand=False,
+        volume=100,
+        joined=joined,
+        left=left,
+        source=0,
+        video_info=None,
+        presentation_info=None,
+    )
+    return types.UpdatedGroupCallParticipant(chat_id, participant)
+
+
+def test_updates_are_tracked_without_fetching():
+    fetched = []
+
+    async def fetch(chat_id):
+        fetched.append(chat_id)
+        return {1: False}
+
+    async def run():
+        tracker = participants.CallParticipants(fetch, max_age=60)
+        assert await tracker.get(-100) == {1: False}
+
+        tracker.on_update(_update(-100, 2, joined=True))
+        tracker.on_update(_update(-100, 1, muted_by_admin=True))
+        assert await tracker.get(-100) == {1: True, 2: False}
+
+        tracker.on_update(_update(-100, 2, left=True))
+        assert await tracker.get(-100) == {1: True}
+        return tracker
+
+    tracker = asyncio.run(run())
+    assert fetched == [-100]
+    assert tracker.fetches == 1
+
+
+def test_updates_for_unknown_chats_are_ignored():
+    async def fetch(chat_id):
+        return {}
+
+    tracker = participants.CallParticipants(fetch)
+    tracker.on_update(_update(-200, 1, joined=True))
+    assert tracker.chats == {}